@@ -1,26 +1,101 @@
 """The SteamVR integration."""
 
-import json
+import asyncio
 import logging
-from dataclasses import fields
+import time
+from collections.abc import Iterable
+from dataclasses import replace
+from pathlib import Path
 
 import homeassistant.helpers.config_validation as cv
 import websockets
 from homeassistant.components import persistent_notification
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, CONF_NAME, CONF_PORT, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import device_registry as dr
 from homeassistant.helpers import discovery
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.typing import ConfigType
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
-
-from .const import DOMAIN
-from .device import VRDeviceActivityLevel, VRState
-from .utils import denormalize_vr_event_name, normalize_vr_event_name
+from websockets.extensions.permessage_deflate import ClientPerMessageDeflateFactory
+
+from .capture import TrafficRecorder
+from .coalescer import EventCoalescer
+from .codec import json_dumps, json_loads
+from .commands import CommandTracker
+from .connections import CONNECT_ERRORS, async_get_connection_manager
+from .const import (
+    CAPABILITY_EVENT_CODES,
+    CAPABILITY_IMAGE_CACHE,
+    CAPABILITY_REGISTER_EVENTS,
+    CAPABILITY_STATE_DELTA,
+    CAPTURE_BACKUPS,
+    CAPTURE_MAX_BYTES,
+    COMMAND_BUFFER_SIZE,
+    CONF_CAPTURE_TRAFFIC,
+    CONF_COMMAND_TIMEOUT,
+    CONF_COMPRESSION_LEVEL,
+    CONF_COMPRESSION_WINDOW_BITS,
+    CONF_EVENT_COALESCING,
+    CONF_EVENT_COALESCING_RULES,
+    CONF_HEARTBEAT_INTERVAL,
+    CONF_HEARTBEAT_MISSES,
+    CONF_IMAGE_MAX_SIZE,
+    CONF_MAX_FRAME_SIZE,
+    CONF_NOTIFICATION_RATE,
+    CONF_WAIT_FOR_ACK,
+    DEFAULT_COMMAND_TIMEOUT,
+    DEFAULT_COMPRESSION_LEVEL,
+    DEFAULT_COMPRESSION_WINDOW_BITS,
+    DEFAULT_EVENT_COALESCING,
+    DEFAULT_HEARTBEAT_INTERVAL,
+    DEFAULT_HEARTBEAT_MISSES,
+    DEFAULT_IMAGE_MAX_SIZE,
+    DEFAULT_MAX_FRAME_SIZE,
+    DEFAULT_NOTIFICATION_RATE,
+    DOMAIN,
+    FRAME_QUEUE_SIZE,
+    HISTORY_SIZE,
+    IMAGE_CACHE_SIZE,
+    NOTIFICATION_QUEUE_SIZE,
+    RESUBSCRIBE_DELAY,
+    STATE_RESTORE_GRACE,
+    STATE_SAVE_DELAY,
+    STATE_STORAGE_VERSION,
+)
+from .device import (
+    VRDeviceActivityLevel,
+    VRState,
+    VRStateDecodeError,
+    dataclass_apply_patch,
+    dataclass_from_dict,
+    vr_state_changed_fields,
+    vr_state_to_dict,
+)
+from .history import StateHistory
+from .images import NotificationImageCache
+from .metrics import CoordinatorMetrics
+from .notifications import NotificationQueue
+from .sessions import SessionTracker
+from .subscriptions import (
+    EventSubscriptionManager,
+    async_get_subscription_manager,
+    async_remove_subscription_manager,
+)
+from .utils import (
+    VR_EVENT_CODES,
+    denormalize_vr_event_name,
+    normalize_vr_event_name,
+    vr_event_name_from_code,
+)
 
 _LOGGER = logging.getLogger(__name__)
+# Fields of the state the play sessions are derived from
+SESSION_FIELDS = frozenset(
+    {"is_openvr_connected", "current_application_key", "hmd_activity_level"}
+)
 PLATFORMS = [Platform.NOTIFY, Platform.SENSOR, Platform.BINARY_SENSOR, Platform.BUTTON]
 
 CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
@@ -55,29 +130,56 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         )
     )
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS[1:])
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
     return True
 
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the config entry so the coordinator reads the new options."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(
         entry, PLATFORMS[1:]
     ):
-        if (
-            f"{entry.entry_id}_coordinator" in hass.data[DOMAIN]
-            and hass.data[DOMAIN][f"{entry.entry_id}_coordinator"].websocket
-        ):
-            await hass.data[DOMAIN][f"{entry.entry_id}_coordinator"].websocket.close()
-            hass.data[DOMAIN].pop(f"{entry.entry_id}_coordinator")
+        if coordinator := hass.data[DOMAIN].pop(f"{entry.entry_id}_coordinator", None):
+            await coordinator.async_shutdown()
+            if coordinator.websocket:
+                await coordinator.websocket.close()
 
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forget the connection state and subscriptions of a removed config entry."""
+    async_get_connection_manager(hass).async_remove(entry.entry_id)
+    async_remove_subscription_manager(hass, entry.entry_id)
+
+
 class SteamVRCoordinator(DataUpdateCoordinator):
     """SteamVR coordinator."""
 
-    def __init__(self, hass: HomeAssistant, config_entry: ConfigEntry, url) -> None:
-        """Initialize coordinator."""
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config_entry: ConfigEntry,
+        url,
+        *,
+        replay: bool = False,
+    ) -> None:
+        """Initialize coordinator.
+
+        Args:
+            hass: The Home Assistant instance.
+            config_entry: The config entry of the agent.
+            url: The websocket URL of the agent.
+            replay: Create a coordinator for replaying a capture, which
+                handles the frames without firing events, persisting the
+                state or sending anything to the agent.
+
+        """
         super().__init__(
             hass,
             _LOGGER,
@@ -89,74 +191,460 @@ class SteamVRCoordinator(DataUpdateCoordinator):
         self.config_entry = config_entry
         self.websocket = None
         self.entry_id = config_entry.entry_id
+        self.replay = replay
         self.device_id = None
+        # Fields changed by the pending update, None means notify everyone
+        self._changed_fields: set[str] | None = None
+        # Number of entity updates skipped because their fields did not change
+        self.suppressed_updates = 0
+        self.event_coalescer = EventCoalescer(
+            hass,
+            (
+                config_entry.options.get(
+                    CONF_EVENT_COALESCING_RULES, DEFAULT_EVENT_COALESCING
+                )
+                if config_entry.options.get(CONF_EVENT_COALESCING, False)
+                else {}
+            ),
+            self._async_fire_event,
+        )
+        # A replay gets its own subscriptions, the live ones stay untouched
+        self.event_subscriptions = (
+            EventSubscriptionManager()
+            if replay
+            else async_get_subscription_manager(hass, self.entry_id)
+        )
+        self.commands = CommandTracker(
+            hass,
+            config_entry.options.get(CONF_COMMAND_TIMEOUT, DEFAULT_COMMAND_TIMEOUT),
+            COMMAND_BUFFER_SIZE,
+        )
+        self.images = NotificationImageCache(
+            hass,
+            config_entry.options.get(CONF_IMAGE_MAX_SIZE, DEFAULT_IMAGE_MAX_SIZE),
+            IMAGE_CACHE_SIZE,
+        )
+        self.notifications = NotificationQueue(
+            hass,
+            config_entry,
+            NOTIFICATION_QUEUE_SIZE,
+            config_entry.options.get(CONF_NOTIFICATION_RATE, DEFAULT_NOTIFICATION_RATE),
+        )
+        # Features announced by the agent for the current connection
+        self.agent_capabilities: frozenset[str] = frozenset()
+        # Round-trip time of the last heartbeat in seconds
+        self.latency: float | None = None
+        self.metrics = CoordinatorMetrics()
+        self.history = StateHistory(HISTORY_SIZE)
+        self.sessions = SessionTracker(
+            hass, Path(hass.config.path(DOMAIN, "sessions", f"{self.entry_id}.jsonl"))
+        )
+        self.recorder: TrafficRecorder | None = None
+        if config_entry.options.get(CONF_CAPTURE_TRAFFIC, False) and not replay:
+            self.recorder = TrafficRecorder(
+                hass,
+                Path(hass.config.path(DOMAIN, "captures", self.entry_id)),
+                CAPTURE_MAX_BYTES,
+                CAPTURE_BACKUPS,
+            )
+        # Payload bytes of the current connection, before compression
+        self.bytes_received = 0
+        self.bytes_sent = 0
+        self._state_store: Store[dict] = Store(
+            hass, STATE_STORAGE_VERSION, f"{DOMAIN}.{self.entry_id}.state"
+        )
+        self._state_to_save: VRState | None = None
+        # True while the data is the state restored at startup
+        self.stale = False
+        self._stale_timer: asyncio.TimerHandle | None = None
+        self._shutting_down = False
+        # Last full state of the agent and its sequence number, which
+        # state_delta messages are applied to
+        self._delta_base: VRState | None = None
+        self._state_seq: int | None = None
+        self._state_requested = False
+        # Subscriptions are restored once the capabilities of a new
+        # connection are known, or after a delay for agents not sending them
+        self._resubscribe_timer: asyncio.TimerHandle | None = None
+        # Pulses of haptic patterns waiting for their start on the event loop
+        self.haptic_timers: set[asyncio.TimerHandle] = set()
+        # While a batch of frames is handled, its last state waits here
+        self._batching = False
+        self._batched_state: VRState | None = None
+
+    async def async_shutdown(self) -> None:
+        """Emit the pending coalesced events and shut down the coordinator."""
+        # The disconnected state published while closing is not saved
+        self._shutting_down = True
+        if self._stale_timer is not None:
+            self._stale_timer.cancel()
+            self._stale_timer = None
+        self.event_subscriptions.async_set_sender(None)
+        self.event_coalescer.async_flush()
+        self.async_cancel_haptic_timers()
+        self.commands.async_cancel_all()
+        self.notifications.async_cancel_all()
+        if self.recorder is not None:
+            self.recorder.async_flush()
+        # A replay shares the files of the live entry, it does not write them
+        if not self.replay:
+            self.sessions.async_shutdown()
+        await super().async_shutdown()
+
+    @callback
+    def async_cancel_haptic_timers(self) -> None:
+        """Cancel the haptic pulses not sent yet."""
+        for timer in self.haptic_timers:
+            timer.cancel()
+        self.haptic_timers.clear()
+
+    @callback
+    def async_set_updated_data(self, data: VRState) -> None:
+        """Store new data and notify the entities whose fields changed."""
+        changed_fields = vr_state_changed_fields(self.data, data)
+        was_stale = self.stale
+        if was_stale:
+            self.stale = False
+            changed_fields.add("stale")
+            if self._stale_timer is not None:
+                self._stale_timer.cancel()
+                self._stale_timer = None
+        if changed_fields:
+            self.history.record(self.hass.loop.time(), data)
+            # A game still running after a restart leaves the session
+            # fields unchanged, open its session from the confirmed state
+            if not self.replay and (
+                was_stale or not SESSION_FIELDS.isdisjoint(changed_fields)
+            ):
+                self.sessions.async_update(data)
+        # The first live state confirms the restored one, every entity
+        # writes it even if its fields did not change
+        self._changed_fields = None if was_stale else changed_fields
+        super().async_set_updated_data(data)
+
+    @callback
+    def async_update_fields(self, changed_fields: set[str]) -> None:
+        """Notify the entities subscribed to fields outside of the VRState."""
+        self._changed_fields = changed_fields
+        self.async_update_listeners()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update the listeners subscribed to the changed fields.
+
+        Listeners registered with a context (a frozenset of field names, see
+        ``vr_state_changed_fields``) are only called when one of their fields
+        changed. Listeners without a context are always called.
+        """
+        changed_fields = self._changed_fields
+        self._changed_fields = None
+        if changed_fields is None:
+            super().async_update_listeners()
+            return
+
+        for update_callback, context in list(self._listeners.values()):
+            if context is None or not changed_fields.isdisjoint(context):
+                update_callback()
+            else:
+                self.suppressed_updates += 1
 
     async def _async_update_data(self):
+        # Restore before connecting, so a live frame is never overwritten
+        state = await self._async_restore_state()
+        await self.sessions.async_load()
         self.config_entry.async_create_background_task(
             self.hass, self.run_server(), "steam_vr_ws"
         )
-        return VRState(is_openvr_connected=False)
+        return state
+
+    async def _async_restore_state(self) -> VRState:
+        """Return the last saved VR state, marked stale if it was connected.
+
+        A stale state is replaced by the first live frame, or by a
+        disconnected state once the grace period expires.
+        """
+        try:
+            stored = await self._state_store.async_load()
+        except HomeAssistantError as err:
+            _LOGGER.warning("Could not load the last SteamVR state: %s", err)
+            stored = None
+        if stored is None:
+            return VRState(is_openvr_connected=False)
+        try:
+            state = dataclass_from_dict(VRState, stored)
+        except VRStateDecodeError as err:
+            _LOGGER.warning("Ignoring invalid saved state: %s", err)
+            return VRState(is_openvr_connected=False)
+        if state.is_openvr_connected:
+            self.stale = True
+            self._stale_timer = self.hass.loop.call_later(
+                STATE_RESTORE_GRACE, self._async_expire_stale_state
+            )
+        return state
+
+    @callback
+    def _async_expire_stale_state(self) -> None:
+        """Drop the restored state the agent did not confirm in time."""
+        self._stale_timer = None
+        if self.stale:
+            disconnected = VRState(is_openvr_connected=False)
+            self.async_set_updated_data(disconnected)
+            self._async_save_state(disconnected)
+
+    @callback
+    def _async_save_state(self, state: VRState) -> None:
+        """Save a state reported by the agent, debounced."""
+        if self.replay or state == self._state_to_save:
+            return
+        self._state_to_save = state
+        self._state_store.async_delay_save(self._state_data_to_save, STATE_SAVE_DELAY)
+
+    @callback
+    def _state_data_to_save(self) -> dict:
+        """Return the data of the state to save."""
+        return vr_state_to_dict(self._state_to_save)
 
     async def run_server(self):
-        """Connect to the websocket server."""
-        async for websocket in websockets.connect(self.url):
+        """Connect to the websocket server, reconnecting with backoff.
+
+        Connections are opened through the shared connection manager, which
+        staggers the attempts of all agents.
+        """
+        manager = async_get_connection_manager(self.hass)
+        while True:
             try:
-                self.websocket = websocket
-                async for message in websocket:
-                    await self.on_message(message)
-            except websockets.ConnectionClosed:
-                self.async_set_updated_data(VRState(is_openvr_connected=False))
+                websocket = await manager.async_connect(
+                    self.entry_id, self.url, self._connect_options()
+                )
+            except CONNECT_ERRORS as err:
+                _LOGGER.debug("Could not connect to %s: %s", self.url, err)
+            else:
+                try:
+                    async with websocket:
+                        await self._async_run_connection(websocket)
+                except websockets.ConnectionClosed:
+                    pass
+                finally:
+                    manager.async_disconnected(self.entry_id)
+            await asyncio.sleep(manager.async_retry_delay(self.entry_id))
+
+    async def _async_run_connection(self, websocket) -> None:
+        """Handle the messages of a connection until it is closed."""
+        heartbeat = self.config_entry.async_create_background_task(
+            self.hass, self._async_heartbeat(websocket), "steamvr_heartbeat"
+        )
+        reader = None
+        try:
+            self.websocket = websocket
+            self.metrics.connections += 1
+            self.bytes_received = 0
+            self.bytes_sent = 0
+            self.event_subscriptions.async_set_sender(self._async_send_subscription)
+            self._resubscribe_timer = self.hass.loop.call_later(
+                RESUBSCRIBE_DELAY, self._async_resubscribe_events
+            )
+            await self._async_replay_commands()
+            self.notifications.async_set_sender(self._async_send_notification)
+            frames: asyncio.Queue = asyncio.Queue(FRAME_QUEUE_SIZE)
+            reader = self.config_entry.async_create_background_task(
+                self.hass, self._async_read_frames(websocket, frames), "steamvr_reader"
+            )
+            while True:
+                # Handle everything received so far in one loop iteration
+                batch = [await frames.get()]
+                while not frames.empty():
+                    batch.append(frames.get_nowait())
+                closed = batch.pop() if isinstance(batch[-1], Exception) else None
+                self._async_handle_frames(batch)
+                if closed is not None:
+                    raise closed
+        finally:
+            heartbeat.cancel()
+            if reader is not None:
+                reader.cancel()
+            if self._resubscribe_timer is not None:
+                self._resubscribe_timer.cancel()
+                self._resubscribe_timer = None
+            self.async_cancel_haptic_timers()
+            self.event_subscriptions.async_set_sender(None)
+            self.notifications.async_set_sender(None)
+            self.websocket = None
+            self.agent_capabilities = frozenset()
+            self.images.async_reset_agent()
+            self._delta_base = None
+            self._state_seq = None
+            self._state_requested = False
+            self.latency = None
+            self.async_update_fields({"latency"})
+            disconnected = VRState(is_openvr_connected=False)
+            self.async_set_updated_data(disconnected)
+            # Keep the saved state when Home Assistant stops or reloads the entry
+            if not self._shutting_down and not asyncio.current_task().cancelling():
+                self._async_save_state(disconnected)
+
+    async def _async_read_frames(self, websocket, frames: asyncio.Queue) -> None:
+        """Read frames into the queue, ending with the ConnectionClosed error."""
+        try:
+            while True:
+                # Skip the UTF-8 decoding, the codec parses bytes directly
+                await frames.put(await websocket.recv(decode=False))
+        except websockets.ConnectionClosed as err:
+            await frames.put(err)
+
+    async def _async_heartbeat(self, websocket) -> None:
+        """Ping the agent and drop the connection when it stops answering.
+
+        The measured round-trip time is published to the latency sensor.
+        """
+        options = self.config_entry.options
+        interval = options.get(CONF_HEARTBEAT_INTERVAL, DEFAULT_HEARTBEAT_INTERVAL)
+        max_misses = options.get(CONF_HEARTBEAT_MISSES, DEFAULT_HEARTBEAT_MISSES)
+        if not interval:
+            return
+        misses = 0
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                pong_waiter = await websocket.ping()
+                async with asyncio.timeout(interval):
+                    self.latency = await pong_waiter
+            except TimeoutError:
+                misses += 1
+                if misses >= max_misses:
+                    _LOGGER.debug("SteamVR agent missed %s heartbeats", misses)
+                    # The link is dead, closing it cleanly would only time out
+                    websocket.transport.abort()
+                    return
                 continue
-            finally:
-                self.async_set_updated_data(VRState(is_openvr_connected=False))
+            except websockets.ConnectionClosed:
+                return
+            misses = 0
+            self.async_update_fields({"latency"})
+
+    def _connect_options(self) -> dict:
+        """Return the compression and frame size options of the connection."""
+        options = self.config_entry.options
+        connect_options = {
+            "max_size": options.get(CONF_MAX_FRAME_SIZE, DEFAULT_MAX_FRAME_SIZE) * 1024,
+            "compression": None,
+            # Liveness is checked by the heartbeat
+            "ping_interval": None,
+        }
+        if level := options.get(CONF_COMPRESSION_LEVEL, DEFAULT_COMPRESSION_LEVEL):
+            window_bits = options.get(
+                CONF_COMPRESSION_WINDOW_BITS, DEFAULT_COMPRESSION_WINDOW_BITS
+            )
+            connect_options["extensions"] = [
+                ClientPerMessageDeflateFactory(
+                    server_max_window_bits=window_bits,
+                    client_max_window_bits=window_bits,
+                    compress_settings={"level": level, "memLevel": 5},
+                )
+            ]
+        return connect_options
 
     async def on_message(self, message: str | bytes):
         """Handle incoming messages from the websocket server.
 
         Args:
-            message (str | bytes): The incoming message.
+            message (str | bytes): The incoming frame, holding a message or
+                an array of messages.
 
         """
-        message_dict = json.loads(message)
+        self._async_handle_frames((message,))
+
+    @callback
+    def _async_handle_frames(self, frames: Iterable[str | bytes]) -> None:
+        """Handle frames received back-to-back, publishing the state once.
+
+        Messages are handled in order, so events reach the bus in the order
+        the agent sent them, but only the last state of the batch is
+        published to the entities.
+        """
+        self._batching = True
+        try:
+            for frame in frames:
+                self._async_handle_frame(frame)
+        finally:
+            self._batching = False
+            if (vr_state := self._batched_state) is not None:
+                self._batched_state = None
+                self.async_set_updated_data(vr_state)
+                self._async_save_state(vr_state)
+
+    @callback
+    def _async_handle_frame(self, message: str | bytes) -> None:
+        """Decode a frame holding a message or an array of messages."""
+        start = time.perf_counter()
+        if self.recorder is not None:
+            self.recorder.async_record("in", message)
+        self.bytes_received += len(message)
+        try:
+            decoded = json_loads(message)
+        except ValueError as err:
+            self.metrics.messages_invalid += 1
+            _LOGGER.warning("Ignoring an invalid frame from the SteamVR agent: %s", err)
+            return
+        self.metrics.decode_time.record(time.perf_counter() - start)
+        for message_dict in decoded if isinstance(decoded, list) else (decoded,):
+            if not isinstance(message_dict, dict):
+                self.metrics.messages_invalid += 1
+                _LOGGER.warning(
+                    "Ignoring a message of the SteamVR agent that is not an object: %.100r",
+                    message_dict,
+                )
+                continue
+            try:
+                self.metrics.messages_received[message_dict.get("type", "legacy")] += 1
+                self._async_handle_message(message_dict)
+            except (AttributeError, KeyError, TypeError, ValueError) as err:
+                # A malformed message must not end the connection
+                self.metrics.messages_invalid += 1
+                _LOGGER.warning(
+                    "Ignoring a malformed message of the SteamVR agent (%r): %.100r",
+                    err,
+                    message_dict,
+                )
+                continue
+            if self._resubscribe_timer is not None:
+                self._async_resubscribe_events()
+        self.metrics.handling_time.record(time.perf_counter() - start)
+
+    @callback
+    def _async_handle_message(self, message_dict: dict) -> None:
+        """Handle a decoded message from the websocket server."""
         if "type" not in message_dict:
             # Support for legacy client, will be removed in the future
-            if (
-                "is_openvr_connected" in message_dict
-                and message_dict["is_openvr_connected"]
-            ):
-                if self.config_entry.options.get(
-                    "replace_standby_with_idle", False
-                ) and (
-                    message_dict["hmd_activity_level"]
-                    == VRDeviceActivityLevel.standby.value
-                ):
-                    message_dict["hmd_activity_level"] = VRDeviceActivityLevel.idle
-                vr_state = dataclass_from_dict(VRState, message_dict)
-                self.async_set_updated_data(vr_state)
+            self._async_handle_state(message_dict)
             # elif "error" in vr_state_dict and vr_state_dict["error"]:
             #     self.async_set_updated_data(VRState(False, error=vr_state_dict["error"]))
             return
         if message_dict["type"] == "state":
-            if (
-                "is_openvr_connected" in message_dict
-                and message_dict["is_openvr_connected"]
-            ):
-                if self.config_entry.options.get(
-                    "replace_standby_with_idle", False
-                ) and (
-                    message_dict["hmd_activity_level"]
-                    == VRDeviceActivityLevel.standby.value
-                ):
-                    message_dict["hmd_activity_level"] = VRDeviceActivityLevel.idle
-                vr_state = dataclass_from_dict(VRState, message_dict)
-                self.async_set_updated_data(vr_state)
-                return
+            self._async_handle_state(message_dict)
+            return
+        if message_dict["type"] == "capabilities":
+            self.agent_capabilities = frozenset(message_dict.get("capabilities", ()))
+            if CAPABILITY_EVENT_CODES in self.agent_capabilities:
+                self._async_send_control_message(
+                    {"type": "event_codes", "codes": VR_EVENT_CODES}
+                )
+            if CAPABILITY_STATE_DELTA in self.agent_capabilities:
+                self._async_request_state()
+            return
+        if message_dict["type"] == "state_delta":
+            self._async_handle_state_delta(message_dict)
+            return
+        if message_dict["type"] == "ack":
+            self.commands.async_handle_ack(message_dict)
+            return
         if message_dict["type"] == "event":
-            if message_dict[
+            if message_dict.get(
                 "event_type"
-            ] == "port_changed" and self.config_entry.options.get(
+            ) == "port_changed" and self.config_entry.options.get(
                 "port_auto_update", True
             ):
+                if self.replay:
+                    return
                 entry_data = {**self.config_entry.data}
                 entry_data[CONF_PORT] = message_dict["event_data"]
                 self.hass.config_entries.async_update_entry(
@@ -167,10 +655,7 @@ class SteamVRCoordinator(DataUpdateCoordinator):
                     f"SteamVR port has changed to {message_dict['event_data']}, configuration has been updated.",
                     "SteamVR Port Changed",
                 )
-
-                self.hass.async_create_task(
-                    self.hass.config_entries.async_reload(self.config_entry.entry_id)
-                )
+                # The update listener reloads the entry with the new port
                 return
             if not self.device_id:
                 device_registry = dr.async_get(self.hass)
@@ -180,35 +665,181 @@ class SteamVRCoordinator(DataUpdateCoordinator):
                 if device_entry:
                     self.device_id = device_entry.id
             if self.device_id:
-                # Normalize the event type from WebSocket API format to Home Assistant format
-                normalized_event_type = normalize_vr_event_name(
-                    message_dict["event_type"]
-                )
-                event_data = {
-                    "device_id": self.device_id,
-                    "type": normalized_event_type,
-                    "data": message_dict["event_data"],
+                if (event_code := message_dict.get("event_code")) is not None:
+                    # Agents supporting event codes send them instead of names
+                    normalized_event_type = vr_event_name_from_code(event_code)
+                    if normalized_event_type is None:
+                        _LOGGER.debug("Ignoring unknown event code %s", event_code)
+                        return
+                else:
+                    # Normalize the event type from WebSocket API format to Home Assistant format
+                    normalized_event_type = normalize_vr_event_name(
+                        message_dict["event_type"]
+                    )
+                if not self.event_coalescer.async_add(
+                    normalized_event_type, message_dict["event_data"]
+                ):
+                    self._async_fire_event(
+                        normalized_event_type, message_dict["event_data"]
+                    )
+
+    @callback
+    def _async_fire_event(
+        self, event_type: str, data, count: int | None = None
+    ) -> None:
+        """Fire a SteamVR event on the Home Assistant bus.
+
+        Args:
+            event_type: The event type (in Home Assistant format).
+            data: The event data sent by the agent.
+            count: The number of events merged by the coalescer, if any.
+
+        """
+        event_data = {
+            "device_id": self.device_id,
+            "type": event_type,
+            "data": data,
+        }
+        if count is not None:
+            event_data["count"] = count
+        self.metrics.events_fired[event_type] += 1
+        if not self.replay:
+            self.hass.bus.async_fire("steamvr_event", event_data)
+
+    @callback
+    def _async_handle_state(self, message_dict: dict) -> None:
+        """Decode a state message and publish it to the entities."""
+        try:
+            vr_state = dataclass_from_dict(VRState, message_dict)
+        except VRStateDecodeError as err:
+            _LOGGER.warning("Ignoring invalid state message: %s", err)
+            return
+        if "seq" in message_dict:
+            # A full snapshot of an agent sending state_delta messages
+            self._delta_base = vr_state
+            self._state_seq = message_dict["seq"]
+            self._state_requested = False
+        self._async_publish_state(vr_state)
+
+    @callback
+    def _async_handle_state_delta(self, message_dict: dict) -> None:
+        """Apply a partial state message to the last full state.
+
+        Only the changed fields, including nested controller fields, are
+        sent. A gap in the sequence numbers means a message was lost, a full
+        snapshot is requested instead of applying it.
+        """
+        seq = message_dict.get("seq")
+        if (
+            self._delta_base is None
+            or self._state_seq is None
+            or seq != self._state_seq + 1
+        ):
+            self._async_request_state()
+            return
+        try:
+            vr_state = dataclass_apply_patch(
+                self._delta_base, message_dict.get("state", {})
+            )
+        except VRStateDecodeError as err:
+            _LOGGER.warning("Ignoring invalid state_delta message: %s", err)
+            self._async_request_state()
+            return
+        self._delta_base = vr_state
+        self._state_seq = seq
+        self._async_publish_state(vr_state)
+
+    @callback
+    def _async_request_state(self) -> None:
+        """Ask the agent for a full state snapshot, once until it arrives."""
+        if self._state_requested:
+            return
+        self._state_requested = True
+        self._async_send_control_message({"type": "request_state"})
+
+    @callback
+    def _async_publish_state(self, vr_state: VRState) -> None:
+        """Publish a state reported by the agent to the entities."""
+        if not vr_state.is_openvr_connected:
+            return
+        if (
+            self.config_entry.options.get("replace_standby_with_idle", False)
+            and vr_state.hmd_activity_level is VRDeviceActivityLevel.standby
+        ):
+            vr_state = replace(vr_state, hmd_activity_level=VRDeviceActivityLevel.idle)
+        if self._batching:
+            if self._batched_state is not None:
+                self.metrics.states_merged += 1
+            self._batched_state = vr_state
+            return
+        self.async_set_updated_data(vr_state)
+        self._async_save_state(vr_state)
+
+    @callback
+    def _async_resubscribe_events(self) -> None:
+        """Send all active event subscriptions to a newly connected agent.
+
+        Called after the first message of the connection, which is the
+        capabilities message of agents announcing them, or after a delay.
+        Agents supporting register_events get the whole set in one frame,
+        other agents one register_event message per event.
+        """
+        if self._resubscribe_timer is not None:
+            self._resubscribe_timer.cancel()
+            self._resubscribe_timer = None
+        if not (events := self.event_subscriptions.active_events):
+            return
+        if CAPABILITY_REGISTER_EVENTS in self.agent_capabilities:
+            self._async_send_control_message(
+                {
+                    "type": "register_events",
+                    "commands": [denormalize_vr_event_name(event) for event in events],
                 }
-                self.hass.bus.async_fire("steamvr_event", event_data)
+            )
+            return
+        for event in events:
+            self._async_send_subscription("register_event", event)
+
+    @callback
+    def _async_send_subscription(self, message_type: str, event: str) -> None:
+        """Send a single subscription change to the agent in the background."""
+        self._async_send_control_message(
+            {"type": message_type, "command": denormalize_vr_event_name(event)}
+        )
+
+    @callback
+    def _async_send_control_message(self, payload: dict) -> None:
+        """Send a protocol message to the agent in the background."""
+        if self.replay:
+            return
+        self.config_entry.async_create_background_task(
+            self.hass,
+            self._async_send_control_message_now(payload),
+            f"steamvr_{payload['type']}",
+        )
+
+    async def _async_send_control_message_now(self, payload: dict) -> None:
+        """Send a protocol message, state lost with the connection is re-sent.
+
+        Subscriptions, the event code table and state requests are all sent
+        again after reconnecting, so a failure is only logged.
+        """
+        try:
+            await self.async_send_command(payload, buffer=False)
+        except (HomeAssistantError, websockets.ConnectionClosed) as err:
+            _LOGGER.debug("Could not send %s: %s", payload["type"], err)
 
     async def register_event(self, event):
         """Register SteamVR event.
 
+        The registration is kept until it is unregistered and is sent again
+        every time the connection to the agent is re-established.
+
         Args:
             event: The event to register (in Home Assistant format).
 
-        Raises:
-            HomeAssistantError: If there is no websocket connection.
-
         """
-        if self.websocket:
-            # Convert from Home Assistant format to WebSocket API format
-            websocket_event = denormalize_vr_event_name(event)
-            await self.websocket.send(
-                json.dumps({"type": "register_event", "command": websocket_event})
-            )
-        else:
-            raise HomeAssistantError("No websocket connection")
+        self.event_subscriptions.async_register_manual(event)
 
     async def unregister_event(self, event):
         """Unregister SteamVR event.
@@ -220,20 +851,114 @@ class SteamVRCoordinator(DataUpdateCoordinator):
             HomeAssistantError: If there is no websocket connection.
 
         """
-        if self.websocket:
-            # Convert from Home Assistant format to WebSocket API format
-            websocket_event = denormalize_vr_event_name(event)
-            await self.websocket.send(
-                json.dumps({"type": "unregister_event", "command": websocket_event})
+        if self.event_subscriptions.async_unregister_manual(event):
+            return
+        if event in self.event_subscriptions.active_events:
+            raise HomeAssistantError(
+                f"{event} is used by device triggers and stays registered"
             )
-        else:
+        # Not registered by Home Assistant, ask the agent directly
+        # Convert from Home Assistant format to WebSocket API format
+        websocket_event = denormalize_vr_event_name(event)
+        await self.async_send_command(
+            {"type": "unregister_event", "command": websocket_event}, buffer=False
+        )
+
+    async def send_message(self, payload: dict) -> None:
+        """Encode and send a message to the SteamVR agent.
+
+        Args:
+            payload: The message to send.
+
+        Raises:
+            HomeAssistantError: If there is no websocket connection.
+
+        """
+        if not self.websocket:
             raise HomeAssistantError("No websocket connection")
+        data = json_dumps(payload)
+        self.bytes_sent += len(data)
+        self.metrics.commands_sent += 1
+        if self.recorder is not None:
+            self.recorder.async_record("out", data)
+        await self.websocket.send(data, text=True)
+
+    async def async_send_command(
+        self, payload: dict, *, buffer: bool = True
+    ) -> asyncio.Future:
+        """Send a command with a correlation id to the SteamVR agent.
+
+        Args:
+            payload: The command to send.
+            buffer: Keep the command and send it after reconnecting if there
+                is no connection, instead of raising.
+
+        Returns:
+            A future resolving with the acknowledgement of the agent.
+
+        Raises:
+            HomeAssistantError: If there is no connection and buffer is False.
+
+        """
+        payload, future = self.commands.async_create(payload)
+        if self.websocket is None:
+            if not buffer:
+                raise HomeAssistantError("No websocket connection")
+            self.commands.async_buffer(payload, future)
+        else:
+            await self._async_transmit(payload, future, buffer)
+        return future
+
+    async def async_run_command(self, payload: dict) -> None:
+        """Send a command, waiting for its acknowledgement if configured to.
+
+        Args:
+            payload: The command to send.
+
+        Raises:
+            HomeAssistantError: If the agent rejected the command or did not
+                acknowledge it in time.
 
+        """
+        future = await self.async_send_command(payload)
+        if not self.config_entry.options.get(CONF_WAIT_FOR_ACK, False):
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.commands.timeout)
+        except TimeoutError as err:
+            raise HomeAssistantError("SteamVR did not acknowledge the command") from err
+
+    async def _async_send_notification(self, payload: dict) -> asyncio.Future:
+        """Send a queued notification, with its image prepared for this agent.
+
+        Returns:
+            A future resolving with the acknowledgement of the agent.
+
+        Raises:
+            HomeAssistantError: If there is no connection.
+
+        """
+        return await self.async_send_command(
+            self.images.async_attach(
+                payload, CAPABILITY_IMAGE_CACHE in self.agent_capabilities
+            ),
+            buffer=False,
+        )
 
-def dataclass_from_dict(_class, d):
-    """Convert a dictionary to a dataclass object."""
-    try:
-        fieldtypes = {f.name: f.type for f in fields(_class)}
-        return _class(**{f: dataclass_from_dict(fieldtypes[f], d[f]) for f in d})
-    except Exception:
-        return d  # Not a dataclass field
+    async def _async_transmit(
+        self, payload: dict, future: asyncio.Future, buffer: bool
+    ) -> None:
+        """Send a command, buffering it again if the connection drops."""
+        self.commands.async_sent(payload, future)
+        try:
+            await self.send_message(payload)
+        except (HomeAssistantError, websockets.ConnectionClosed):
+            if not buffer:
+                raise
+            self.commands.async_requeue(payload, future)
+
+    async def _async_replay_commands(self) -> None:
+        """Send the commands buffered while disconnected."""
+        for payload, future in self.commands.async_take_buffered():
+            if not future.done():
+                await self._async_transmit(payload, future, True)
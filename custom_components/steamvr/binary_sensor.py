@@ -2,6 +2,9 @@
 
 from __future__ import annotations
 
+from pathlib import Path
+from typing import Any
+
 import voluptuous as vol
 from homeassistant.components.binary_sensor import (
     ENTITY_ID_FORMAT,
@@ -9,7 +12,14 @@ from homeassistant.components.binary_sensor import (
     BinarySensorEntity,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers import entity_platform
 
@@ -24,6 +34,7 @@ from homeassistant.helpers.entity import Entity, async_generate_entity_id
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
+from .capture import async_replay_capture
 from .const import DOMAIN
 
 
@@ -102,6 +113,12 @@ async def async_setup_entry(
         event = call.data["event"]
         await entity.unregister_event(event)
 
+    async def custom_replay_capture(
+        entity: VRStatusBinarySensor, call: ServiceCall
+    ) -> ServiceResponse:
+        """Replay a traffic capture."""
+        return await entity.replay_capture(call.data["path"], call.data["speed"])
+
     platform = entity_platform.async_get_current_platform()
     platform.async_register_entity_service(
         "register_event",
@@ -117,6 +134,17 @@ async def async_setup_entry(
         },
         custom_unregister_event,
     )
+    platform.async_register_entity_service(
+        "replay_capture",
+        {
+            vol.Required("path"): cv.string,
+            vol.Optional("speed", default=1.0): vol.All(
+                vol.Coerce(float), vol.Range(min=0)
+            ),
+        },
+        custom_replay_capture,
+        supports_response=SupportsResponse.ONLY,
+    )
 
 
 class VRControllerBinarySensor(CoordinatorEntity, BinarySensorEntity):
@@ -144,7 +172,10 @@ class VRControllerBinarySensor(CoordinatorEntity, BinarySensorEntity):
         )
         self.config_entry_id = config_entry.entry_id
 
-        super().__init__(coordinator)
+        super().__init__(
+            coordinator,
+            context=frozenset({f"{controller_side}_controller.is_connected"}),
+        )
 
     @property
     def device_info(self) -> DeviceInfo:
@@ -196,7 +227,10 @@ class VRControllerChargingBinarySensor(CoordinatorEntity, BinarySensorEntity):
         )
         self.config_entry_id = config_entry.entry_id
 
-        super().__init__(coordinator)
+        super().__init__(
+            coordinator,
+            context=frozenset({f"{controller_side}_controller.is_charging"}),
+        )
 
     @property
     def device_info(self) -> DeviceInfo:
@@ -239,7 +273,9 @@ class VRStatusBinarySensor(CoordinatorEntity, BinarySensorEntity):
         self.device_name = f"VR Status ({config_entry.title})"
         self.config_entry_id = config_entry.entry_id
 
-        super().__init__(coordinator)
+        super().__init__(
+            coordinator, context=frozenset({"is_openvr_connected", "error", "stale"})
+        )
 
     @property
     def device_info(self) -> DeviceInfo:
@@ -255,6 +291,8 @@ class VRStatusBinarySensor(CoordinatorEntity, BinarySensorEntity):
         state_data = self.coordinator.data
         self._attr_extra_state_attributes = {
             "error": state_data.error,
+            # The state was restored at startup and not confirmed by the agent
+            "stale": self.coordinator.stale,
         }
         return state_data.is_openvr_connected
 
@@ -270,3 +308,26 @@ class VRStatusBinarySensor(CoordinatorEntity, BinarySensorEntity):
     async def unregister_event(self, event: str) -> None:
         """Unregister an event."""
         await self.coordinator.unregister_event(event)
+
+    async def replay_capture(self, path: str, speed: float) -> dict[str, Any]:
+        """Replay a traffic capture through a separate replay coordinator.
+
+        The live coordinator, its entities and the agent are not affected.
+        Returns the replay statistics and the metrics of the replay.
+        """
+        captures = Path(self.hass.config.path(DOMAIN, "captures"))
+        if not (
+            Path(path).resolve().is_relative_to(captures.resolve())
+            or self.hass.config.is_allowed_path(path)
+        ):
+            raise HomeAssistantError(f"Access to {path} is not allowed")
+        replay = SteamVRCoordinator(
+            self.hass, self.coordinator.config_entry, self.coordinator.url, replay=True
+        )
+        try:
+            result = await async_replay_capture(replay, path, speed)
+        except OSError as err:
+            raise HomeAssistantError(f"Could not read {path}: {err}") from err
+        finally:
+            await replay.async_shutdown()
+        return {**result, "metrics": replay.metrics.as_dict()}
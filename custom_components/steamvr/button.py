@@ -2,15 +2,18 @@
 
 from __future__ import annotations
 
-import json
+from typing import Any
 
+import voluptuous as vol
 from homeassistant.components.button import (
     ENTITY_ID_FORMAT,
     ButtonDeviceClass,
     ButtonEntity,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import entity_platform
 
 from . import SteamVRCoordinator
 
@@ -23,6 +26,27 @@ from homeassistant.helpers.entity import async_generate_entity_id
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
 from .const import DOMAIN
+from .haptics import async_play_haptic_pattern, build_haptic_pattern
+
+# Vibration limits of a haptic pulse
+HAPTIC_MAX_DURATION = 5000
+HAPTIC_MAX_FREQUENCY = 1000
+HAPTIC_DEFAULT_FREQUENCY = 320
+
+PULSE_SCHEMA = vol.Schema(
+    {
+        vol.Required("duration"): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=HAPTIC_MAX_DURATION)
+        ),
+        vol.Optional("amplitude"): vol.All(vol.Coerce(float), vol.Range(min=0, max=1)),
+        vol.Optional("frequency"): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=HAPTIC_MAX_FREQUENCY)
+        ),
+        vol.Optional("pause", default=0): vol.All(
+            vol.Coerce(int), vol.Range(min=0, max=HAPTIC_MAX_DURATION)
+        ),
+    }
+)
 
 
 async def async_setup_entry(
@@ -57,6 +81,33 @@ async def async_setup_entry(
         ]
     )
 
+    async def custom_haptic(
+        entity: VRControllerIdentifyButton, call: ServiceCall
+    ) -> None:
+        """Play a haptic pattern."""
+        pulses = call.data.get("pulses") or [{"duration": call.data["duration"]}]
+        await entity.haptic(
+            build_haptic_pattern(pulses, call.data["amplitude"], call.data["frequency"])
+        )
+
+    platform = entity_platform.async_get_current_platform()
+    platform.async_register_entity_service(
+        "haptic",
+        {
+            vol.Optional("duration", default=200): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=HAPTIC_MAX_DURATION)
+            ),
+            vol.Optional("amplitude", default=1.0): vol.All(
+                vol.Coerce(float), vol.Range(min=0, max=1)
+            ),
+            vol.Optional("frequency", default=HAPTIC_DEFAULT_FREQUENCY): vol.All(
+                vol.Coerce(float), vol.Range(min=1, max=HAPTIC_MAX_FREQUENCY)
+            ),
+            vol.Optional("pulses"): vol.All(cv.ensure_list, [PULSE_SCHEMA]),
+        },
+        custom_haptic,
+    )
+
 
 class VRControllerIdentifyButton(ButtonEntity):
     """Representation of a VR Controller Identify Button (quick vibration)."""
@@ -102,4 +153,8 @@ class VRControllerIdentifyButton(ButtonEntity):
             "command": f"vibrate_controller_{self.controller_side}",
         }
 
-        await self.coordinator.websocket.send(json.dumps(payload))
+        await self.coordinator.async_run_command(payload)
+
+    async def haptic(self, pattern: list[dict[str, Any]]) -> None:
+        """Play a haptic pattern on the controller."""
+        await async_play_haptic_pattern(self.coordinator, self.controller_side, pattern)
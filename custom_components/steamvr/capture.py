@@ -0,0 +1,137 @@
+"""Recording and replay of the SteamVR agent websocket traffic."""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant, callback
+
+from .codec import json_dumps, json_loads
+
+if TYPE_CHECKING:
+    from . import SteamVRCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+CAPTURE_FILE = "capture.jsonl.gz"
+# Seconds between writes of the buffered frames
+FLUSH_INTERVAL = 5
+# Frames buffered before an early write
+FLUSH_FRAMES = 500
+# Frames replayed at max speed before yielding to the event loop
+REPLAY_BATCH = 100
+
+# Batches may be written by several executor threads, keep them in order
+_WRITE_LOCK = threading.Lock()
+
+
+def _write_frames(
+    path: Path,
+    frames: list[tuple[float, str, str | bytes]],
+    max_bytes: int,
+    backups: int,
+) -> None:
+    """Append frames to the capture file, rotating it when it is too large."""
+    with _WRITE_LOCK:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists() and path.stat().st_size >= max_bytes:
+            for index in range(backups - 1, 0, -1):
+                older = path.with_name(f"capture.{index}.jsonl.gz")
+                if older.exists():
+                    os.replace(older, path.with_name(f"capture.{index + 1}.jsonl.gz"))
+            os.replace(path, path.with_name("capture.1.jsonl.gz"))
+        with gzip.open(path, "ab") as file:
+            for timestamp, direction, message in frames:
+                if isinstance(message, bytes):
+                    message = message.decode()
+                file.write(
+                    json_dumps({"t": timestamp, "dir": direction, "msg": message})
+                )
+                file.write(b"\n")
+
+
+def _read_frames(path: str) -> list[dict[str, Any]]:
+    """Read all frames of a capture file."""
+    with gzip.open(path, "rb") as file:
+        return [json_loads(line) for line in file if line.strip()]
+
+
+class TrafficRecorder:
+    """Record every inbound and outbound frame of a coordinator.
+
+    Frames are buffered on the event loop with a monotonic timestamp and
+    written in batches in the executor to a gzip JSON-lines file, which is
+    rotated when it reaches max_bytes.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, directory: Path, max_bytes: int, backups: int
+    ) -> None:
+        """Initialize the recorder."""
+        self.hass = hass
+        self.path = directory / CAPTURE_FILE
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._frames: list[tuple[float, str, str | bytes]] = []
+        self._timer: asyncio.TimerHandle | None = None
+
+    @callback
+    def async_record(self, direction: str, message: str | bytes) -> None:
+        """Buffer a frame, direction is "in" or "out"."""
+        self._frames.append((time.monotonic(), direction, message))
+        if len(self._frames) >= FLUSH_FRAMES:
+            self.async_flush()
+        elif self._timer is None:
+            self._timer = self.hass.loop.call_later(FLUSH_INTERVAL, self.async_flush)
+
+    @callback
+    def async_flush(self) -> None:
+        """Write the buffered frames in the executor."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._frames:
+            return
+        frames, self._frames = self._frames, []
+        self.hass.async_add_executor_job(
+            _write_frames, self.path, frames, self.max_bytes, self.backups
+        )
+
+
+async def async_replay_capture(
+    coordinator: SteamVRCoordinator, path: str, speed: float = 1.0
+) -> dict[str, Any]:
+    """Feed the inbound frames of a capture through the coordinator.
+
+    Args:
+        coordinator: The coordinator handling the frames.
+        path: The capture file.
+        speed: Playback speed relative to the recording, 0 for max speed.
+
+    Returns:
+        The number of replayed frames and the elapsed time in seconds.
+
+    """
+    frames = await coordinator.hass.async_add_executor_job(_read_frames, path)
+    frames = [frame for frame in frames if frame["dir"] == "in"]
+    start = time.monotonic()
+    if frames:
+        first = frames[0]["t"]
+        for index, frame in enumerate(frames):
+            if speed:
+                delay = (frame["t"] - first) / speed - (time.monotonic() - start)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif index % REPLAY_BATCH == 0:
+                await asyncio.sleep(0)
+            await coordinator.on_message(frame["msg"])
+    elapsed = time.monotonic() - start
+    _LOGGER.debug("Replayed %s frames from %s in %.3f s", len(frames), path, elapsed)
+    return {"frames": len(frames), "elapsed": elapsed}
@@ -0,0 +1,128 @@
+"""Coalescing of high-frequency SteamVR events."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from typing import Any
+
+import voluptuous as vol
+from homeassistant.core import HomeAssistant, callback
+
+from .codec import json_dumps
+from .const import (
+    COALESCE_COUNT,
+    COALESCE_KEEP_FIRST,
+    COALESCE_KEEP_LATEST,
+    COALESCE_KEY_DATA,
+)
+
+COALESCING_RULES_SCHEMA = vol.Schema(
+    {
+        str: vol.Schema(
+            {
+                vol.Required("window"): vol.All(
+                    vol.Coerce(float), vol.Range(min=0.01, max=60)
+                ),
+                vol.Required("policy"): vol.In(
+                    [COALESCE_KEEP_LATEST, COALESCE_KEEP_FIRST, COALESCE_COUNT]
+                ),
+                vol.Optional("key"): vol.Any(COALESCE_KEY_DATA, [str]),
+            }
+        )
+    }
+)
+
+
+class _PendingEvent:
+    """An event waiting for its coalescing window to close."""
+
+    __slots__ = ("count", "data", "timer")
+
+    def __init__(self, data: Any) -> None:
+        self.data = data
+        self.count = 1
+        self.timer: asyncio.TimerHandle | None = None
+
+
+class EventCoalescer:
+    """Merge bursts of the same event type into one event per window.
+
+    The first event of a type opens a window, and every event of that type
+    received until the window closes is merged into it according to the
+    policy of the type. Rules with a ``key`` only merge events with the same
+    identity: the same values of the listed data fields, or with ``data``
+    the same data, so events of different devices or properties are kept
+    apart. The policies are:
+
+    - keep_latest: the data of the last event is emitted
+    - keep_first: the data of the first event is emitted
+    - count: only the number of merged events is emitted
+
+    When the window closes one event is emitted with the number of merged
+    events. Event types without a rule are not coalesced.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        rules: dict[str, dict[str, Any]],
+        fire: Callable[[str, Any, int], None],
+    ) -> None:
+        """Initialize the coalescer.
+
+        Args:
+            hass: The Home Assistant instance.
+            rules: Window in seconds, policy and optional identity key for
+                each event type, see COALESCING_RULES_SCHEMA.
+            fire: Called with the event type, data and count of a window.
+
+        """
+        self.hass = hass
+        self.rules = COALESCING_RULES_SCHEMA(rules)
+        self._fire = fire
+        # Open windows by event type and identity
+        self._pending: dict[tuple[str, bytes | None], _PendingEvent] = {}
+
+    @callback
+    def async_add(self, event_type: str, data: Any) -> bool:
+        """Add an event, return False if its type is not coalesced."""
+        if (rule := self.rules.get(event_type)) is None:
+            return False
+        policy = rule["policy"]
+        if (key := rule.get("key")) is None:
+            pending_key = (event_type, None)
+        elif key == COALESCE_KEY_DATA:
+            pending_key = (event_type, json_dumps(data))
+        else:
+            fields = data if isinstance(data, dict) else {}
+            pending_key = (event_type, json_dumps([fields.get(field) for field in key]))
+
+        if (pending := self._pending.get(pending_key)) is not None:
+            pending.count += 1
+            if policy not in (COALESCE_KEEP_FIRST, COALESCE_COUNT):
+                pending.data = data
+            return True
+
+        pending = self._pending[pending_key] = _PendingEvent(
+            None if policy == COALESCE_COUNT else data
+        )
+        pending.timer = self.hass.loop.call_later(
+            rule["window"], self._async_emit, pending_key
+        )
+        return True
+
+    @callback
+    def _async_emit(self, pending_key: tuple[str, bytes | None]) -> None:
+        """Emit the merged event of a closed window."""
+        if (pending := self._pending.pop(pending_key, None)) is None:
+            return
+        if pending.timer is not None:
+            pending.timer.cancel()
+        self._fire(pending_key[0], pending.data, pending.count)
+
+    @callback
+    def async_flush(self) -> None:
+        """Emit all pending events immediately."""
+        for pending_key in list(self._pending):
+            self._async_emit(pending_key)
@@ -0,0 +1,53 @@
+"""JSON codec for the SteamVR websocket messages.
+
+The fastest available backend is picked at import time: orjson (shipped with
+Home Assistant), then msgspec, then the standard library. All backends encode
+to UTF-8 bytes, which are sent as text frames without an intermediate str,
+and raise ValueError for invalid JSON.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Callable
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# Decoder and encoder of each installed backend, fastest first
+BACKENDS: dict[str, tuple[Callable[[str | bytes], Any], Callable[[Any], bytes]]] = {}
+
+if orjson is not None:
+    BACKENDS["orjson"] = (orjson.loads, orjson.dumps)
+
+if msgspec is not None:
+    _decoder = msgspec.json.Decoder()
+
+    def _msgspec_loads(data: str | bytes) -> Any:
+        """Decode a JSON message with msgspec."""
+        try:
+            return _decoder.decode(data)
+        except msgspec.DecodeError as err:
+            raise ValueError(str(err)) from err
+
+    BACKENDS["msgspec"] = (_msgspec_loads, msgspec.json.Encoder().encode)
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Encode an object to a compact JSON message with the standard library."""
+    return json.dumps(obj, separators=(",", ":")).encode()
+
+
+BACKENDS["json"] = (json.loads, _json_dumps)
+
+JSON_BACKEND = next(iter(BACKENDS))
+# Decode a JSON message, and encode an object to a JSON message
+json_loads, json_dumps = BACKENDS[JSON_BACKEND]
@@ -0,0 +1,150 @@
+"""Correlation of outbound SteamVR commands with the agent acknowledgements."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from itertools import count
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+
+
+def _retrieve_exception(future: asyncio.Future) -> None:
+    """Mark the exception of a future as retrieved.
+
+    Most callers do not wait for the acknowledgement, this keeps asyncio from
+    logging the timeouts of their futures.
+    """
+    if not future.cancelled():
+        future.exception()
+
+
+class _PendingCommand:
+    """A command sent to the agent and waiting for its acknowledgement."""
+
+    __slots__ = ("future", "name", "sent_at", "timer")
+
+    def __init__(
+        self,
+        future: asyncio.Future,
+        name: str,
+        sent_at: float,
+        timer: asyncio.TimerHandle,
+    ) -> None:
+        self.future = future
+        self.name = name
+        self.sent_at = sent_at
+        self.timer = timer
+
+
+class CommandTracker:
+    """Assign correlation ids to commands and resolve them on acknowledgement.
+
+    Every command gets an ``id`` field and a future, which resolves with the
+    ``ack`` message the agent replies with, or fails on timeout. Commands
+    issued while disconnected are kept in a bounded buffer until the
+    coordinator replays them after reconnecting.
+    """
+
+    def __init__(self, hass: HomeAssistant, timeout: float, buffer_size: int) -> None:
+        """Initialize the tracker.
+
+        Args:
+            hass: The Home Assistant instance.
+            timeout: Seconds to wait for an acknowledgement.
+            buffer_size: Maximum number of commands buffered while offline.
+
+        """
+        self.hass = hass
+        self.timeout = timeout
+        self.buffer_size = buffer_size
+        self._ids = count(1)
+        self._pending: dict[int, _PendingCommand] = {}
+        self._buffer: deque[tuple[dict[str, Any], asyncio.Future]] = deque()
+        # Last round-trip time in seconds per command name
+        self.round_trip_times: dict[str, float] = {}
+
+    @callback
+    def async_create(self, payload: dict[str, Any]) -> tuple[dict, asyncio.Future]:
+        """Return the payload with a correlation id and its future."""
+        future = self.hass.loop.create_future()
+        future.add_done_callback(_retrieve_exception)
+        return {**payload, "id": next(self._ids)}, future
+
+    @callback
+    def async_sent(self, payload: dict[str, Any], future: asyncio.Future) -> None:
+        """Start waiting for the acknowledgement of a sent command."""
+        command_id = payload["id"]
+        self._pending[command_id] = _PendingCommand(
+            future,
+            # Notifications are sent without a type
+            payload.get("command", payload.get("type", "notification")),
+            self.hass.loop.time(),
+            self.hass.loop.call_later(self.timeout, self._async_timeout, command_id),
+        )
+
+    @callback
+    def async_requeue(self, payload: dict[str, Any], future: asyncio.Future) -> None:
+        """Buffer a command again after sending it failed."""
+        if (pending := self._pending.pop(payload["id"], None)) is not None:
+            pending.timer.cancel()
+        self.async_buffer(payload, future)
+
+    @callback
+    def async_buffer(self, payload: dict[str, Any], future: asyncio.Future) -> None:
+        """Keep a command until the connection is re-established."""
+        if len(self._buffer) >= self.buffer_size:
+            _, dropped = self._buffer.popleft()
+            if not dropped.done():
+                dropped.set_exception(
+                    HomeAssistantError("SteamVR command buffer is full")
+                )
+        self._buffer.append((payload, future))
+
+    @callback
+    def async_take_buffered(self) -> list[tuple[dict[str, Any], asyncio.Future]]:
+        """Remove and return the buffered commands, oldest first."""
+        buffered = list(self._buffer)
+        self._buffer.clear()
+        return buffered
+
+    @callback
+    def async_handle_ack(self, message: dict[str, Any]) -> None:
+        """Resolve the command acknowledged by an ack message."""
+        if (pending := self._pending.pop(message.get("id"), None)) is None:
+            return
+        pending.timer.cancel()
+        self.round_trip_times[pending.name] = self.hass.loop.time() - pending.sent_at
+        if pending.future.done():
+            return
+        if error := message.get("error"):
+            pending.future.set_exception(
+                HomeAssistantError(f"SteamVR command {pending.name} failed: {error}")
+            )
+        else:
+            pending.future.set_result(message)
+
+    @callback
+    def _async_timeout(self, command_id: int) -> None:
+        """Fail a command the agent did not acknowledge in time."""
+        if (pending := self._pending.pop(command_id, None)) is None:
+            return
+        if not pending.future.done():
+            pending.future.set_exception(
+                HomeAssistantError(
+                    f"SteamVR command {pending.name} was not acknowledged"
+                )
+            )
+
+    @callback
+    def async_cancel_all(self) -> None:
+        """Cancel all pending and buffered commands."""
+        for pending in self._pending.values():
+            pending.timer.cancel()
+            pending.future.cancel()
+        self._pending.clear()
+        for _, future in self._buffer:
+            future.cancel()
+        self._buffer.clear()
@@ -10,8 +10,37 @@ from homeassistant import config_entries
 from homeassistant.const import CONF_HOST, CONF_NAME, CONF_PORT
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
-
-from .const import DOMAIN
+from homeassistant.helpers import selector
+
+from .coalescer import COALESCING_RULES_SCHEMA
+from .const import (
+    CONF_BATTERY_DEADBAND,
+    CONF_BATTERY_MIN_INTERVAL,
+    CONF_CAPTURE_TRAFFIC,
+    CONF_COMMAND_TIMEOUT,
+    CONF_COMPRESSION_LEVEL,
+    CONF_COMPRESSION_WINDOW_BITS,
+    CONF_EVENT_COALESCING,
+    CONF_EVENT_COALESCING_RULES,
+    CONF_HEARTBEAT_INTERVAL,
+    CONF_HEARTBEAT_MISSES,
+    CONF_IMAGE_MAX_SIZE,
+    CONF_MAX_FRAME_SIZE,
+    CONF_NOTIFICATION_RATE,
+    CONF_WAIT_FOR_ACK,
+    DEFAULT_BATTERY_DEADBAND,
+    DEFAULT_BATTERY_MIN_INTERVAL,
+    DEFAULT_COMMAND_TIMEOUT,
+    DEFAULT_COMPRESSION_LEVEL,
+    DEFAULT_COMPRESSION_WINDOW_BITS,
+    DEFAULT_EVENT_COALESCING,
+    DEFAULT_HEARTBEAT_INTERVAL,
+    DEFAULT_HEARTBEAT_MISSES,
+    DEFAULT_IMAGE_MAX_SIZE,
+    DEFAULT_MAX_FRAME_SIZE,
+    DEFAULT_NOTIFICATION_RATE,
+    DOMAIN,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -66,8 +95,16 @@ class SteamVROptionsFlowHandler(config_entries.OptionsFlow):
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Manage the options."""
+        errors = {}
         if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
+            try:
+                user_input[CONF_EVENT_COALESCING_RULES] = COALESCING_RULES_SCHEMA(
+                    user_input[CONF_EVENT_COALESCING_RULES]
+                )
+            except vol.Invalid:
+                errors[CONF_EVENT_COALESCING_RULES] = "invalid_coalescing_rules"
+            else:
+                return self.async_create_entry(title="", data=user_input)
 
         return self.async_show_form(
             step_id="init",
@@ -83,6 +120,90 @@ class SteamVROptionsFlowHandler(config_entries.OptionsFlow):
                         "port_auto_update",
                         default=self.config_entry.options.get("port_auto_update", True),
                     ): bool,
+                    vol.Required(
+                        CONF_EVENT_COALESCING,
+                        default=self.config_entry.options.get(
+                            CONF_EVENT_COALESCING, False
+                        ),
+                    ): bool,
+                    vol.Required(
+                        CONF_EVENT_COALESCING_RULES,
+                        default=self.config_entry.options.get(
+                            CONF_EVENT_COALESCING_RULES, DEFAULT_EVENT_COALESCING
+                        ),
+                    ): selector.ObjectSelector(),
+                    vol.Required(
+                        CONF_WAIT_FOR_ACK,
+                        default=self.config_entry.options.get(CONF_WAIT_FOR_ACK, False),
+                    ): bool,
+                    vol.Required(
+                        CONF_COMMAND_TIMEOUT,
+                        default=self.config_entry.options.get(
+                            CONF_COMMAND_TIMEOUT, DEFAULT_COMMAND_TIMEOUT
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=60)),
+                    vol.Required(
+                        CONF_IMAGE_MAX_SIZE,
+                        default=self.config_entry.options.get(
+                            CONF_IMAGE_MAX_SIZE, DEFAULT_IMAGE_MAX_SIZE
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                    vol.Required(
+                        CONF_COMPRESSION_LEVEL,
+                        default=self.config_entry.options.get(
+                            CONF_COMPRESSION_LEVEL, DEFAULT_COMPRESSION_LEVEL
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=9)),
+                    vol.Required(
+                        CONF_COMPRESSION_WINDOW_BITS,
+                        default=self.config_entry.options.get(
+                            CONF_COMPRESSION_WINDOW_BITS,
+                            DEFAULT_COMPRESSION_WINDOW_BITS,
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=9, max=15)),
+                    vol.Required(
+                        CONF_MAX_FRAME_SIZE,
+                        default=self.config_entry.options.get(
+                            CONF_MAX_FRAME_SIZE, DEFAULT_MAX_FRAME_SIZE
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=64)),
+                    vol.Required(
+                        CONF_HEARTBEAT_INTERVAL,
+                        default=self.config_entry.options.get(
+                            CONF_HEARTBEAT_INTERVAL, DEFAULT_HEARTBEAT_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=300)),
+                    vol.Required(
+                        CONF_HEARTBEAT_MISSES,
+                        default=self.config_entry.options.get(
+                            CONF_HEARTBEAT_MISSES, DEFAULT_HEARTBEAT_MISSES
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=10)),
+                    vol.Required(
+                        CONF_CAPTURE_TRAFFIC,
+                        default=self.config_entry.options.get(
+                            CONF_CAPTURE_TRAFFIC, False
+                        ),
+                    ): bool,
+                    vol.Required(
+                        CONF_BATTERY_DEADBAND,
+                        default=self.config_entry.options.get(
+                            CONF_BATTERY_DEADBAND, DEFAULT_BATTERY_DEADBAND
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=50)),
+                    vol.Required(
+                        CONF_BATTERY_MIN_INTERVAL,
+                        default=self.config_entry.options.get(
+                            CONF_BATTERY_MIN_INTERVAL, DEFAULT_BATTERY_MIN_INTERVAL
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=3600)),
+                    vol.Required(
+                        CONF_NOTIFICATION_RATE,
+                        default=self.config_entry.options.get(
+                            CONF_NOTIFICATION_RATE, DEFAULT_NOTIFICATION_RATE
+                        ),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=600)),
                 }
             ),
+            errors=errors,
         )
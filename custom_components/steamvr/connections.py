@@ -0,0 +1,176 @@
+"""Shared management of the connections to the SteamVR agents."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+from datetime import datetime, timedelta
+from typing import Any
+
+import websockets
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONNECT_CONCURRENCY,
+    CONNECT_STAGGER,
+    DOMAIN,
+    RECONNECT_BACKOFF_INITIAL,
+    RECONNECT_BACKOFF_MAX,
+)
+
+CONNECTION_MANAGER = "connection_manager"
+
+STATE_CONNECTING = "connecting"
+STATE_CONNECTED = "connected"
+STATE_WAITING = "waiting"
+STATE_DISCONNECTED = "disconnected"
+
+# Errors of a connection attempt, logged and retried with backoff. A bad
+# host gives an InvalidURI, which is retried in case the entry is fixed.
+CONNECT_ERRORS = (
+    OSError,
+    TimeoutError,
+    websockets.InvalidHandshake,
+    websockets.InvalidURI,
+)
+
+
+@callback
+def async_get_connection_manager(hass: HomeAssistant) -> ConnectionManager:
+    """Return the connection manager shared by all config entries.
+
+    The manager is kept in hass.data across reloads, so an entry reloaded
+    while its agent is unreachable keeps its backoff.
+    """
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (manager := domain_data.get(CONNECTION_MANAGER)) is None:
+        manager = domain_data[CONNECTION_MANAGER] = ConnectionManager(
+            hass, CONNECT_CONCURRENCY, CONNECT_STAGGER
+        )
+    return manager
+
+
+class AgentConnectionState:
+    """Connection state of a single agent."""
+
+    __slots__ = ("attempts", "connected_since", "last_error", "retry_at", "state")
+
+    def __init__(self) -> None:
+        self.state = STATE_DISCONNECTED
+        # Failed attempts since the last successful connection
+        self.attempts = 0
+        self.last_error: str | None = None
+        self.connected_since: datetime | None = None
+        self.retry_at: datetime | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state as a dict for diagnostics."""
+        return {
+            "state": self.state,
+            "attempts": self.attempts,
+            "last_error": self.last_error,
+            "connected_since": self.connected_since,
+            "retry_at": self.retry_at,
+        }
+
+
+class ConnectionManager:
+    """Open the connections of all agents under a common limit.
+
+    Connection attempts are spaced at least ``stagger`` seconds apart and at
+    most ``concurrency`` handshakes run at once, so a restart of Home
+    Assistant with many agents, or a network outage ending, does not open
+    every connection in the same loop iteration. The backoff of each agent
+    is kept here rather than in its coordinator.
+    """
+
+    def __init__(self, hass: HomeAssistant, concurrency: int, stagger: float) -> None:
+        """Initialize the manager.
+
+        Args:
+            hass: The Home Assistant instance.
+            concurrency: Maximum number of handshakes in progress.
+            stagger: Minimum number of seconds between two attempts.
+
+        """
+        self.hass = hass
+        self.stagger = stagger
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._next_slot = 0.0
+        self.agents: dict[str, AgentConnectionState] = {}
+
+    async def async_connect(
+        self, entry_id: str, url: str, options: dict[str, Any]
+    ) -> websockets.ClientConnection:
+        """Open a connection to an agent once a slot is free.
+
+        Args:
+            entry_id: The config entry of the agent.
+            url: The websocket URL of the agent.
+            options: Keyword arguments of websockets.connect.
+
+        Returns:
+            The open connection, which the caller has to close.
+
+        Raises:
+            One of CONNECT_ERRORS: If the connection could not be opened.
+
+        """
+        agent = self.agents.setdefault(entry_id, AgentConnectionState())
+        agent.state = STATE_CONNECTING
+        agent.retry_at = None
+        await self._async_wait_for_slot()
+        async with self._semaphore:
+            try:
+                websocket = await websockets.connect(url, **options)
+            except CONNECT_ERRORS as err:
+                agent.state = STATE_DISCONNECTED
+                agent.attempts += 1
+                agent.last_error = str(err) or type(err).__name__
+                raise
+        agent.state = STATE_CONNECTED
+        agent.attempts = 0
+        agent.last_error = None
+        agent.connected_since = dt_util.utcnow()
+        return websocket
+
+    async def _async_wait_for_slot(self) -> None:
+        """Wait until stagger seconds passed since the previous attempt."""
+        now = self.hass.loop.time()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.stagger
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    @callback
+    def async_disconnected(self, entry_id: str) -> None:
+        """Record that the connection of an agent was closed."""
+        if (agent := self.agents.get(entry_id)) is not None:
+            agent.state = STATE_DISCONNECTED
+            agent.connected_since = None
+
+    @callback
+    def async_retry_delay(self, entry_id: str) -> float:
+        """Return the seconds to wait before the next attempt of an agent.
+
+        The delay grows exponentially with the failed attempts, with jitter
+        so agents failing together do not retry in lockstep.
+        """
+        agent = self.agents.setdefault(entry_id, AgentConnectionState())
+        delay = min(
+            RECONNECT_BACKOFF_MAX, RECONNECT_BACKOFF_INITIAL * 2**agent.attempts
+        )
+        delay = random.uniform(delay / 2, delay)
+        agent.state = STATE_WAITING
+        agent.retry_at = dt_util.utcnow() + timedelta(seconds=delay)
+        return delay
+
+    @callback
+    def async_remove(self, entry_id: str) -> None:
+        """Forget an agent whose config entry was removed."""
+        self.agents.pop(entry_id, None)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state of all agents for diagnostics."""
+        return {entry_id: agent.as_dict() for entry_id, agent in self.agents.items()}
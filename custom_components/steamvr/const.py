@@ -1,3 +1,117 @@
 """Constants for the SteamVR integration."""
 
 DOMAIN = "steamvr"
+
+CONF_EVENT_COALESCING = "event_coalescing"
+CONF_EVENT_COALESCING_RULES = "event_coalescing_rules"
+CONF_COMMAND_TIMEOUT = "command_timeout"
+CONF_WAIT_FOR_ACK = "wait_for_ack"
+CONF_IMAGE_MAX_SIZE = "image_max_size"
+CONF_COMPRESSION_LEVEL = "compression_level"
+CONF_COMPRESSION_WINDOW_BITS = "compression_window_bits"
+CONF_MAX_FRAME_SIZE = "max_frame_size"
+CONF_HEARTBEAT_INTERVAL = "heartbeat_interval"
+CONF_HEARTBEAT_MISSES = "heartbeat_misses"
+CONF_CAPTURE_TRAFFIC = "capture_traffic"
+CONF_BATTERY_DEADBAND = "battery_deadband"
+CONF_BATTERY_MIN_INTERVAL = "battery_min_interval"
+CONF_NOTIFICATION_RATE = "notification_rate"
+
+DEFAULT_COMMAND_TIMEOUT = 5
+# Maximum number of commands kept while the agent is disconnected
+COMMAND_BUFFER_SIZE = 32
+DEFAULT_IMAGE_MAX_SIZE = 1024
+# zlib level of permessage-deflate, 0 disables compression
+DEFAULT_COMPRESSION_LEVEL = 6
+DEFAULT_COMPRESSION_WINDOW_BITS = 15
+# Maximum size of an incoming message in KiB
+DEFAULT_MAX_FRAME_SIZE = 1024
+# Seconds between pings, the link is dead after the given number of misses
+DEFAULT_HEARTBEAT_INTERVAL = 5
+DEFAULT_HEARTBEAT_MISSES = 2
+# Frames read from the connection ahead of their processing
+FRAME_QUEUE_SIZE = 64
+# Controller battery changes smaller than the deadband (percent) or sooner
+# than the minimum interval (seconds) after the last one are not reported
+DEFAULT_BATTERY_DEADBAND = 0
+DEFAULT_BATTERY_MIN_INTERVAL = 0
+# Maximum number of notifications sent per minute, 0 for no limit
+DEFAULT_NOTIFICATION_RATE = 30
+# Notifications waiting to be sent, and the seconds after which a
+# notification that was not sent is dropped
+NOTIFICATION_QUEUE_SIZE = 32
+DEFAULT_NOTIFICATION_TTL = 300
+# Exponential reconnect backoff, in seconds
+RECONNECT_BACKOFF_INITIAL = 1
+RECONNECT_BACKOFF_MAX = 60
+# Connections opened at the same time across all agents, and the minimum
+# number of seconds between two connection attempts
+CONNECT_CONCURRENCY = 4
+CONNECT_STAGGER = 0.25
+# The last VR state is saved at most every STATE_SAVE_DELAY seconds. A state
+# restored at startup is kept until the first live frame, or is replaced by
+# a disconnected state after STATE_RESTORE_GRACE seconds
+STATE_STORAGE_VERSION = 1
+STATE_SAVE_DELAY = 10
+STATE_RESTORE_GRACE = 30
+# State samples kept in memory per headset, 12 bytes each
+HISTORY_SIZE = 4096
+# Number of encoded notification images kept in memory
+IMAGE_CACHE_SIZE = 8
+
+# Size of a traffic capture file before rotation, and rotated files kept
+CAPTURE_MAX_BYTES = 10 * 1024 * 1024
+CAPTURE_BACKUPS = 5
+
+# Features announced by the agent in a capabilities message
+CAPABILITY_IMAGE_CACHE = "image_cache"
+CAPABILITY_EVENT_CODES = "event_codes"
+CAPABILITY_STATE_DELTA = "state_delta"
+CAPABILITY_HAPTIC_PATTERNS = "haptic_patterns"
+CAPABILITY_REGISTER_EVENTS = "register_events"
+# Seconds to wait for the capabilities of a new connection before restoring
+# the event subscriptions
+RESUBSCRIBE_DELAY = 1
+
+COALESCE_KEEP_LATEST = "keep_latest"
+COALESCE_KEEP_FIRST = "keep_first"
+COALESCE_COUNT = "count"
+# Rule key merging only the events with the same data
+COALESCE_KEY_DATA = "data"
+
+# Window (in seconds) and policy used to coalesce noisy event types. Events
+# of the types with a key are only merged with events of the same data, so
+# separate devices and properties are not merged into one event.
+DEFAULT_EVENT_COALESCING = {
+    "vr-event-mouse-move": {"window": 0.1, "policy": COALESCE_KEEP_LATEST},
+    "vr-event-touch-pad-move": {"window": 0.1, "policy": COALESCE_KEEP_LATEST},
+    "vr-event-scroll-smooth": {"window": 0.1, "policy": COALESCE_COUNT},
+    "vr-event-scroll-discrete": {"window": 0.1, "policy": COALESCE_COUNT},
+    "vr-event-property-changed": {
+        "window": 0.5,
+        "policy": COALESCE_KEEP_LATEST,
+        "key": COALESCE_KEY_DATA,
+    },
+    "vr-event-tracked-device-updated": {
+        "window": 0.5,
+        "policy": COALESCE_KEEP_LATEST,
+        "key": COALESCE_KEY_DATA,
+    },
+    "vr-event-chaperone-temp-data-has-changed": {
+        "window": 0.5,
+        "policy": COALESCE_KEEP_FIRST,
+    },
+    "vr-event-overlay-shared-texture-changed": {
+        "window": 1.0,
+        "policy": COALESCE_COUNT,
+    },
+    "vr-event-screenshot-progress-to-dashboard": {
+        "window": 0.5,
+        "policy": COALESCE_KEEP_LATEST,
+    },
+    "vr-event-input-progress-update": {
+        "window": 0.5,
+        "policy": COALESCE_KEEP_LATEST,
+    },
+    "vr-event-desktop-view-updating": {"window": 1.0, "policy": COALESCE_COUNT},
+}
@@ -1,7 +1,10 @@
 """The SteamVR device classes."""
 
-from dataclasses import dataclass, field
+from collections.abc import Callable
+from dataclasses import asdict, dataclass, field, fields, is_dataclass, replace
 from enum import Enum
+from functools import cache
+from typing import Any
 
 
 class VRDeviceActivityLevel(Enum):
@@ -15,7 +18,11 @@ class VRDeviceActivityLevel(Enum):
     idle_timeout = 4
 
 
-@dataclass
+class VRStateDecodeError(ValueError):
+    """Error raised when a message cannot be decoded into a VR dataclass."""
+
+
+@dataclass(slots=True)
 class VRController:
     """Dataclass representing a VR controller."""
 
@@ -24,7 +31,7 @@ class VRController:
     is_charging: bool | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class VRState:
     """Dataclass representing the state of the VR system."""
 
@@ -36,3 +43,160 @@ class VRState:
     right_controller: VRController = field(default_factory=lambda: VRController(False))
     left_controller: VRController = field(default_factory=lambda: VRController(False))
     error: str | None = None
+
+
+def _enum_converter(enum_class: type[Enum]) -> Callable[[Any], Enum]:
+    """Return a converter from a raw value to a member of the enum."""
+
+    def convert(value: Any) -> Enum:
+        try:
+            return enum_class(value)
+        except ValueError as err:
+            raise VRStateDecodeError(
+                f"Invalid value {value!r} for {enum_class.__name__}"
+            ) from err
+
+    return convert
+
+
+@cache
+def _compile_decoder(cls: type) -> Callable[[dict[str, Any]], Any]:
+    """Build a decoder for a dataclass.
+
+    The field converters are resolved once per class, so decoding a message
+    is a single pass over its keys. Unknown keys are ignored and missing keys
+    fall back to the field defaults.
+    """
+    converters: dict[str, Callable[[Any], Any] | None] = {}
+    for class_field in fields(cls):
+        field_type = class_field.type
+        if is_dataclass(field_type):
+            converters[class_field.name] = _compile_decoder(field_type)
+        elif isinstance(field_type, type) and issubclass(field_type, Enum):
+            converters[class_field.name] = _enum_converter(field_type)
+        else:
+            converters[class_field.name] = None
+
+    def decode(data: dict[str, Any]) -> Any:
+        if not isinstance(data, dict):
+            raise VRStateDecodeError(
+                f"Expected an object for {cls.__name__}, got {type(data).__name__}"
+            )
+        kwargs = {}
+        for key, value in data.items():
+            if key not in converters:
+                continue
+            converter = converters[key]
+            if converter is None:
+                kwargs[key] = value
+            elif value is not None:
+                kwargs[key] = converter(value)
+        return cls(**kwargs)
+
+    return decode
+
+
+def dataclass_from_dict(_class: type, data: dict[str, Any]) -> Any:
+    """Convert a dictionary to a dataclass object.
+
+    Raises:
+        VRStateDecodeError: If the data does not match the dataclass.
+
+    """
+    return _compile_decoder(_class)(data)
+
+
+@cache
+def _compile_patcher(cls: type) -> Callable[[Any, dict[str, Any]], Any]:
+    """Build a function applying a partial dictionary to a dataclass.
+
+    Nested dataclasses are patched recursively, so a patch only has to carry
+    the fields that changed, for example a single controller battery level.
+    """
+    converters: dict[str, Callable[[Any], Any] | None] = {}
+    patchers: dict[str, Callable[[Any, dict[str, Any]], Any]] = {}
+    for class_field in fields(cls):
+        field_type = class_field.type
+        if is_dataclass(field_type):
+            patchers[class_field.name] = _compile_patcher(field_type)
+        elif isinstance(field_type, type) and issubclass(field_type, Enum):
+            converters[class_field.name] = _enum_converter(field_type)
+        else:
+            converters[class_field.name] = None
+
+    def patch(instance: Any, data: dict[str, Any]) -> Any:
+        if not isinstance(data, dict):
+            raise VRStateDecodeError(
+                f"Expected an object for {cls.__name__}, got {type(data).__name__}"
+            )
+        changes = {}
+        for key, value in data.items():
+            if key in patchers:
+                if value is not None:
+                    changes[key] = patchers[key](getattr(instance, key), value)
+            elif key in converters:
+                converter = converters[key]
+                if converter is None:
+                    changes[key] = value
+                elif value is not None:
+                    changes[key] = converter(value)
+        # Always a new instance, the previous state is kept for diffing
+        return replace(instance, **changes)
+
+    return patch
+
+
+def dataclass_apply_patch(instance: Any, data: dict[str, Any]) -> Any:
+    """Return a copy of a dataclass object with a partial dictionary applied.
+
+    Raises:
+        VRStateDecodeError: If the data does not match the dataclass.
+
+    """
+    return _compile_patcher(type(instance))(instance, data)
+
+
+def vr_state_to_dict(state: VRState) -> dict[str, Any]:
+    """Convert a VR state to a JSON serializable dictionary.
+
+    The result can be decoded again with ``dataclass_from_dict``.
+    """
+    data = asdict(state)
+    data["hmd_activity_level"] = state.hmd_activity_level.value
+    return data
+
+
+_VR_CONTROLLER_FIELDS = tuple(f.name for f in fields(VRController))
+_VR_STATE_FIELDS = tuple(f.name for f in fields(VRState))
+
+
+def vr_state_changed_fields(old: VRState | None, new: VRState) -> set[str]:
+    """Return the names of the fields that differ between two VR states.
+
+    Nested controller fields are reported as dotted paths, for example
+    ``right_controller.battery_percentage``.
+    """
+    if old is None:
+        return {
+            *_VR_STATE_FIELDS,
+            *(
+                f"{side}.{name}"
+                for side in ("right_controller", "left_controller")
+                for name in _VR_CONTROLLER_FIELDS
+            ),
+        }
+
+    changed = set()
+    for name in _VR_STATE_FIELDS:
+        old_value = getattr(old, name)
+        new_value = getattr(new, name)
+        if old_value == new_value:
+            continue
+        changed.add(name)
+        if isinstance(new_value, VRController):
+            for controller_field in _VR_CONTROLLER_FIELDS:
+                if getattr(old_value, controller_field, None) != getattr(
+                    new_value, controller_field
+                ):
+                    changed.add(f"{name}.{controller_field}")
+    return changed
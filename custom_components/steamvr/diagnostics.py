@@ -0,0 +1,55 @@
+"""Diagnostics support for SteamVR."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST
+from homeassistant.core import HomeAssistant
+
+from . import SteamVRCoordinator
+from .connections import async_get_connection_manager
+from .const import DOMAIN
+from .device import vr_state_to_dict
+
+TO_REDACT = {CONF_HOST}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: SteamVRCoordinator = hass.data[DOMAIN][f"{entry.entry_id}_coordinator"]
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "connection": {
+            "connected": coordinator.websocket is not None,
+            "agent_capabilities": sorted(coordinator.agent_capabilities),
+            "latency": coordinator.latency,
+            "bytes_received": coordinator.bytes_received,
+            "bytes_sent": coordinator.bytes_sent,
+            "command_round_trip_times": coordinator.commands.round_trip_times,
+            "event_subscriptions": coordinator.event_subscriptions.active_events,
+        },
+        # Connection state of every agent, keyed by config entry id
+        "agents": async_get_connection_manager(hass).as_dict(),
+        "metrics": {
+            **coordinator.metrics.as_dict(),
+            "suppressed_updates": coordinator.suppressed_updates,
+        },
+        "history": {
+            "samples": coordinator.history.count,
+            "memory_size": coordinator.history.memory_size,
+        },
+        "sessions": coordinator.sessions.as_dict(),
+        "notifications": coordinator.notifications.as_dict(),
+        "state": (
+            vr_state_to_dict(coordinator.data) if coordinator.data is not None else None
+        ),
+        "state_stale": coordinator.stale,
+    }
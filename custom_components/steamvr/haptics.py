@@ -0,0 +1,121 @@
+"""Haptic patterns for SteamVR controllers."""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, Any
+
+import websockets
+from homeassistant.core import callback
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import CAPABILITY_HAPTIC_PATTERNS
+
+if TYPE_CHECKING:
+    from . import SteamVRCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def build_haptic_pattern(
+    pulses: list[dict[str, Any]], amplitude: float, frequency: float
+) -> list[dict[str, Any]]:
+    """Return the pulses with their start offsets, in milliseconds.
+
+    Args:
+        pulses: Pulses with a duration and an optional amplitude, frequency
+            and pause before the next pulse.
+        amplitude: Amplitude of the pulses without one, from 0 to 1.
+        frequency: Frequency of the pulses without one, in Hz.
+
+    """
+    pattern = []
+    start = 0
+    for pulse in pulses:
+        pattern.append(
+            {
+                "start": start,
+                "duration": pulse["duration"],
+                "amplitude": pulse.get("amplitude", amplitude),
+                "frequency": pulse.get("frequency", frequency),
+            }
+        )
+        start += pulse["duration"] + pulse.get("pause", 0)
+    return pattern
+
+
+async def async_play_haptic_pattern(
+    coordinator: SteamVRCoordinator, side: str, pattern: list[dict[str, Any]]
+) -> None:
+    """Play a haptic pattern on a controller.
+
+    Agents supporting haptic patterns receive the whole pattern in one
+    command and time the pulses locally. Other agents get one vibration
+    command per pulse, scheduled on the event loop at the pulse start. The
+    scheduled pulses are cancelled on disconnection and shutdown.
+
+    Args:
+        coordinator: The coordinator of the agent.
+        side: The controller, "right" or "left".
+        pattern: The pulses, as returned by build_haptic_pattern.
+
+    Raises:
+        HomeAssistantError: If there is no connection or the agent rejected
+            the pattern.
+
+    """
+    if CAPABILITY_HAPTIC_PATTERNS in coordinator.agent_capabilities:
+        await coordinator.async_run_command(
+            {
+                "type": "command",
+                "command": "haptic",
+                "controller": side,
+                "pattern": pattern,
+            }
+        )
+        return
+
+    if coordinator.websocket is None:
+        raise HomeAssistantError("No websocket connection")
+    loop = coordinator.hass.loop
+    base = loop.time()
+    for pulse in pattern:
+        when = base + pulse["start"] / 1000
+        coordinator.haptic_timers.add(
+            loop.call_at(when, _async_send_pulse, coordinator, side, pulse, when)
+        )
+
+
+@callback
+def _async_send_pulse(
+    coordinator: SteamVRCoordinator, side: str, pulse: dict[str, Any], when: float
+) -> None:
+    """Send a scheduled pulse and record how late it was sent."""
+    # The pulses due until now have all been moved to the ready queue
+    timers = coordinator.haptic_timers
+    timers.difference_update([timer for timer in timers if timer.when() <= when])
+    coordinator.metrics.haptic_jitter.record(coordinator.hass.loop.time() - when)
+    coordinator.config_entry.async_create_background_task(
+        coordinator.hass,
+        _async_send_vibration(
+            coordinator,
+            {
+                "type": "command",
+                "command": f"vibrate_controller_{side}",
+                "duration": pulse["duration"],
+                "amplitude": pulse["amplitude"],
+                "frequency": pulse["frequency"],
+            },
+        ),
+        "steamvr_haptic_pulse",
+    )
+
+
+async def _async_send_vibration(
+    coordinator: SteamVRCoordinator, payload: dict[str, Any]
+) -> None:
+    """Send a vibration command, a pulse is not worth sending late."""
+    try:
+        await coordinator.async_send_command(payload, buffer=False)
+    except (HomeAssistantError, websockets.ConnectionClosed) as err:
+        _LOGGER.debug("Could not send a haptic pulse: %s", err)
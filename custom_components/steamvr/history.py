@@ -0,0 +1,136 @@
+"""In-memory history of the SteamVR state."""
+
+from __future__ import annotations
+
+from array import array
+
+from .device import VRDeviceActivityLevel, VRState
+
+# Bits of the flags column
+_FLAG_OPENVR_CONNECTED = 1
+# Battery column value of an unknown battery level
+_NO_BATTERY = -1
+_ON_HEAD = VRDeviceActivityLevel.user_interaction.value
+
+# Seconds of discharge needed before a drain rate is reported
+MIN_DRAIN_SECONDS = 600
+# Rise of a battery level (percent) meaning the controller was charged while
+# not reported, smaller rises are measurement noise
+CHARGED_RISE = 5
+
+
+class StateHistory:
+    """Fixed-size ring buffer of VR state samples in numeric columns.
+
+    A sample is recorded for every state change. It takes 12 bytes, stored
+    in preallocated arrays: a float64 timestamp, the headset activity level,
+    both controller battery levels and a flags byte. With the default 4096
+    samples a headset uses 48 KiB, whatever the length of the session.
+
+    The derived values are maintained as samples are added and evicted, so
+    reading them does not scan the buffer. The discharge of each controller
+    is the index of the first sample since it was last charged, the drain
+    rate is read from the battery column between that sample and the last.
+    """
+
+    BYTES_PER_SAMPLE = 12
+
+    def __init__(self, size: int) -> None:
+        """Initialize the history, keeping the given number of samples."""
+        self.size = size
+        self.times = array("d", bytes(8 * size))
+        self.activity_levels = array("b", bytes(size))
+        self.batteries = {side: array("b", bytes(size)) for side in ("right", "left")}
+        self.flags = array("B", bytes(size))
+        self._start = 0
+        self.count = 0
+        # Seconds with OpenVR running, and with the headset on the head,
+        # between the samples in the buffer
+        self._tracked_time = 0.0
+        self._on_head_time = 0.0
+        # Index of the first sample of the current discharge of each side
+        self._discharges: dict[str, int | None] = {"right": None, "left": None}
+
+    @property
+    def memory_size(self) -> int:
+        """Return the number of bytes used by the columns."""
+        return self.size * self.BYTES_PER_SAMPLE
+
+    def record(self, now: float, state: VRState) -> None:
+        """Add a sample of the state at the given monotonic time."""
+        if self.count == self.size:
+            oldest = self._start
+            self._start = (oldest + 1) % self.size
+            self.count -= 1
+            self._account(oldest, self.times[oldest] - self.times[self._start])
+            for side, start in self._discharges.items():
+                if start == oldest:
+                    # The discharge goes on from its oldest kept sample
+                    self._discharges[side] = self._start
+        last = (self._start + self.count - 1) % self.size if self.count else None
+        if last is not None:
+            self._account(last, now - self.times[last])
+
+        index = (self._start + self.count) % self.size
+        self.count += 1
+        self.times[index] = now
+        self.activity_levels[index] = state.hmd_activity_level.value
+        self.flags[index] = _FLAG_OPENVR_CONNECTED if state.is_openvr_connected else 0
+        for side, controller in (
+            ("right", state.right_controller),
+            ("left", state.left_controller),
+        ):
+            battery = controller.battery_percentage
+            level = _NO_BATTERY if battery is None else max(0, min(battery, 100))
+            self.batteries[side][index] = level
+            if (
+                level == _NO_BATTERY
+                or not controller.is_connected
+                or controller.is_charging
+            ):
+                self._discharges[side] = None
+            elif (
+                self._discharges[side] is None
+                or self.batteries[side][last] + CHARGED_RISE < level
+            ):
+                self._discharges[side] = index
+
+    def _account(self, index: int, duration: float) -> None:
+        """Add the time spent in the state of a sample to the totals."""
+        if self.flags[index] & _FLAG_OPENVR_CONNECTED:
+            self._tracked_time += duration
+            if self.activity_levels[index] == _ON_HEAD:
+                self._on_head_time += duration
+
+    def drain_rate(self, side: str) -> float | None:
+        """Return the battery drain of a controller in percent per hour."""
+        if (start := self._discharges[side]) is None:
+            return None
+        last = (self._start + self.count - 1) % self.size
+        duration = self.times[last] - self.times[start]
+        if duration < MIN_DRAIN_SECONDS:
+            return None
+        batteries = self.batteries[side]
+        return (batteries[start] - batteries[last]) / duration * 3600
+
+    def time_to_empty(self, side: str) -> float | None:
+        """Return the estimated hours until the battery of a controller is empty."""
+        if not (rate := self.drain_rate(side)) or rate < 0:
+            return None
+        last = (self._start + self.count - 1) % self.size
+        return self.batteries[side][last] / rate
+
+    def on_head_ratio(self, now: float) -> float | None:
+        """Return the share of the OpenVR time with the headset on the head."""
+        tracked_time = self._tracked_time
+        on_head_time = self._on_head_time
+        if self.count:
+            # The last sample lasts until now
+            last = (self._start + self.count - 1) % self.size
+            if self.flags[last] & _FLAG_OPENVR_CONNECTED:
+                tracked_time += now - self.times[last]
+                if self.activity_levels[last] == _ON_HEAD:
+                    on_head_time += now - self.times[last]
+        if not tracked_time:
+            return None
+        return on_head_time / tracked_time
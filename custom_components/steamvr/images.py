@@ -0,0 +1,153 @@
+"""Notification image processing for SteamVR."""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import io
+import logging
+from collections import OrderedDict
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+
+_LOGGER = logging.getLogger(__name__)
+
+# Payload field of a loaded image, its digest and base64 encoding
+_ENCODED_IMAGE = "_encoded_image"
+
+
+def _load_image(image_data: str | None, image_file: str | None) -> tuple[bytes, str]:
+    """Return the raw bytes and the digest of a base64 image or a local file."""
+    if image_file is not None:
+        with open(image_file, "rb") as file:
+            raw = file.read()
+    else:
+        try:
+            raw = base64.b64decode(image_data, validate=True)
+        except (binascii.Error, TypeError) as err:
+            raise HomeAssistantError("imageData is not valid base64") from err
+    return raw, hashlib.sha256(raw).hexdigest()
+
+
+def _encode_image(raw: bytes, max_size: int) -> tuple[str, str]:
+    """Downscale an image to max_size pixels, return its digest and base64.
+
+    Images are sent unchanged if Pillow is not installed, if they already fit
+    or if they are animated, since re-encoding would drop the animation.
+    """
+    if max_size:
+        try:
+            from PIL import Image, UnidentifiedImageError
+        except ImportError:
+            Image = None
+        if Image is not None:
+            try:
+                with Image.open(io.BytesIO(raw)) as image:
+                    if max(image.size) > max_size and not getattr(
+                        image, "is_animated", False
+                    ):
+                        image_format = "JPEG" if image.format == "JPEG" else "PNG"
+                        image.thumbnail((max_size, max_size))
+                        output = io.BytesIO()
+                        image.save(output, format=image_format)
+                        raw = output.getvalue()
+            except (UnidentifiedImageError, OSError) as err:
+                _LOGGER.debug("Sending image without resizing: %s", err)
+    return hashlib.sha256(raw).hexdigest(), base64.b64encode(raw).decode()
+
+
+class NotificationImageCache:
+    """Prepare notification images off the event loop and cache the result.
+
+    Decoding, resizing and hashing run in the executor. Encoded images are
+    kept in an LRU cache keyed by the hash of the original content, so
+    sending the same snapshot again costs a single hash. Agents supporting
+    the image cache receive an image once per connection with its
+    ``imageHash``, later sends only carry the ``imageRef``.
+    """
+
+    def __init__(self, hass: HomeAssistant, max_size: int, cache_size: int) -> None:
+        """Initialize the cache.
+
+        Args:
+            hass: The Home Assistant instance.
+            max_size: Longest image side in pixels, 0 to keep the size.
+            cache_size: Number of encoded images to keep.
+
+        """
+        self.hass = hass
+        self.max_size = max_size
+        self.cache_size = cache_size
+        self._encoded: OrderedDict[str, tuple[str, str]] = OrderedDict()
+        self._sent_to_agent: set[str] = set()
+
+    @callback
+    def async_reset_agent(self) -> None:
+        """Forget which images the agent has, after a reconnect."""
+        self._sent_to_agent.clear()
+
+    async def async_load(self, payload: dict[str, Any]) -> dict[str, Any]:
+        """Return the notification payload with its image loaded and encoded.
+
+        Handles ``imageData`` (base64) and ``imageFile`` (a file readable by
+        Home Assistant), which are replaced by the encoded image. Call
+        async_attach when sending the payload. ``imagePath`` and
+        ``imageUrl`` are resolved by the agent and are left untouched.
+
+        Raises:
+            HomeAssistantError: If the image is not valid base64, the file is
+                not allowed or could not be read.
+
+        """
+        image_data = payload.pop("imageData", None)
+        image_file = payload.pop("imageFile", None)
+        if image_data is None and image_file is None:
+            return payload
+        if image_file is not None and not self.hass.config.is_allowed_path(image_file):
+            raise HomeAssistantError(f"Access to {image_file} is not allowed")
+
+        try:
+            raw, key = await self.hass.async_add_executor_job(
+                _load_image, image_data, image_file
+            )
+        except OSError as err:
+            raise HomeAssistantError(f"Could not read {image_file}: {err}") from err
+
+        if (cached := self._encoded.get(key)) is not None:
+            self._encoded.move_to_end(key)
+        else:
+            cached = self._encoded[key] = await self.hass.async_add_executor_job(
+                _encode_image, raw, self.max_size
+            )
+            while len(self._encoded) > self.cache_size:
+                self._encoded.popitem(last=False)
+        payload[_ENCODED_IMAGE] = cached
+        return payload
+
+    @callback
+    def async_attach(
+        self, payload: dict[str, Any], agent_has_cache: bool
+    ) -> dict[str, Any]:
+        """Return a loaded payload to send, with its image or a reference.
+
+        Agents with the image cache get the image with its ``imageHash``
+        once per connection, and only the ``imageRef`` afterwards.
+        """
+        if (encoded_image := payload.get(_ENCODED_IMAGE)) is None:
+            return payload
+        payload = {
+            key: value for key, value in payload.items() if key != _ENCODED_IMAGE
+        }
+        digest, encoded = encoded_image
+        if not agent_has_cache:
+            payload["imageData"] = encoded
+        elif digest in self._sent_to_agent:
+            payload["imageRef"] = digest
+        else:
+            payload["imageData"] = encoded
+            payload["imageHash"] = digest
+            self._sent_to_agent.add(digest)
+        return payload
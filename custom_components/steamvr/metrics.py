@@ -0,0 +1,108 @@
+"""Runtime metrics of the SteamVR coordinator."""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_right
+from collections import Counter
+from typing import Any
+
+# Upper bounds of the timing histogram buckets, in seconds
+TIMING_BUCKETS = (
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+)
+
+
+class Histogram:
+    """Histogram with fixed buckets, its size does not grow with samples."""
+
+    __slots__ = ("bounds", "count", "counts", "total")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        """Initialize the histogram, the last bucket holds larger values."""
+        self.bounds = bounds
+        self.counts = array("Q", bytes(8 * (len(bounds) + 1)))
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, value: float) -> None:
+        """Add a sample."""
+        self.counts[bisect_right(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean of the samples."""
+        return self.total / self.count if self.count else None
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the histogram as a dict for diagnostics."""
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "buckets": {
+                **{
+                    f"le_{bound}": count
+                    for bound, count in zip(self.bounds, self.counts)
+                },
+                "inf": self.counts[-1],
+            },
+        }
+
+
+class CoordinatorMetrics:
+    """Counters and histograms of the coordinator hot path.
+
+    Recording only increments counters and bucket slots, so it is cheap
+    enough to stay enabled in production.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the metrics."""
+        self.messages_received: Counter[str] = Counter()
+        self.events_fired: Counter[str] = Counter()
+        # Frames that could not be decoded and messages that could not be
+        # handled, dropped without closing the connection
+        self.messages_invalid = 0
+        self.commands_sent = 0
+        self.connections = 0
+        # States replaced by a later state of the same frame batch
+        self.states_merged = 0
+        # Controller battery levels not reported because of the deadband or
+        # the minimum interval
+        self.battery_updates_suppressed = 0
+        self.decode_time = Histogram(TIMING_BUCKETS)
+        self.handling_time = Histogram(TIMING_BUCKETS)
+        # Lateness of the haptic pulses scheduled on the event loop
+        self.haptic_jitter = Histogram(TIMING_BUCKETS)
+
+    @property
+    def reconnects(self) -> int:
+        """Return the number of connections after the first one."""
+        return max(self.connections - 1, 0)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the metrics as a dict for diagnostics."""
+        return {
+            "messages_received": dict(self.messages_received),
+            "events_fired": dict(self.events_fired),
+            "messages_invalid": self.messages_invalid,
+            "commands_sent": self.commands_sent,
+            "reconnects": self.reconnects,
+            "states_merged": self.states_merged,
+            "battery_updates_suppressed": self.battery_updates_suppressed,
+            "decode_time": self.decode_time.as_dict(),
+            "handling_time": self.handling_time.as_dict(),
+            "haptic_jitter": self.haptic_jitter.as_dict(),
+        }
@@ -0,0 +1,265 @@
+"""Priority queue of the notifications sent to SteamVR."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from functools import partial
+from itertools import count
+from typing import Any
+
+import websockets
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+
+_LOGGER = logging.getLogger(__name__)
+
+PRIORITY_LOW = "low"
+PRIORITY_NORMAL = "normal"
+PRIORITY_HIGH = "high"
+PRIORITIES = {PRIORITY_LOW: 0, PRIORITY_NORMAL: 1, PRIORITY_HIGH: 2}
+
+
+def _chain_result(source: asyncio.Future, target: asyncio.Future) -> None:
+    """Copy the outcome of a command acknowledgement to a notification."""
+    if target.done():
+        return
+    if source.cancelled():
+        target.cancel()
+    elif (err := source.exception()) is not None:
+        target.set_exception(err)
+    else:
+        target.set_result(source.result())
+
+
+def _retrieve_exception(future: asyncio.Future) -> None:
+    """Mark the exception of a notification nobody waits for as retrieved."""
+    if not future.cancelled():
+        future.exception()
+
+
+class _QueuedNotification:
+    """A notification waiting to be sent."""
+
+    __slots__ = ("collapse_key", "future", "payload", "priority", "seq", "timer")
+
+    def __init__(
+        self,
+        payload: dict[str, Any],
+        priority: int,
+        seq: int,
+        collapse_key: str | None,
+        future: asyncio.Future,
+    ) -> None:
+        self.payload = payload
+        self.priority = priority
+        self.seq = seq
+        self.collapse_key = collapse_key
+        self.future = future
+        self.timer: asyncio.TimerHandle | None = None
+
+    def sort_key(self) -> tuple[int, int]:
+        """Return the key of the next notification to send, the largest."""
+        return self.priority, -self.seq
+
+
+class NotificationQueue:
+    """Send notifications by priority, at a limited rate.
+
+    Notifications wait here until they are sent, the highest priority first
+    and in arrival order within a priority. A notification with the collapse
+    key of a queued one replaces it in its place in the queue. Each
+    notification expires after its time to live, so a headset connecting
+    after an outage does not get a backlog of stale alerts. When the queue is
+    full the oldest notification of the lowest priority is dropped.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        config_entry: ConfigEntry,
+        size: int,
+        rate: int,
+    ) -> None:
+        """Initialize the queue.
+
+        Args:
+            hass: The Home Assistant instance.
+            config_entry: The config entry owning the sending task.
+            size: Maximum number of queued notifications.
+            rate: Maximum number of notifications sent per minute, 0 for no
+                limit.
+
+        """
+        self.hass = hass
+        self.config_entry = config_entry
+        self.size = size
+        self.interval = 60 / rate if rate else 0.0
+        self._queue: list[_QueuedNotification] = []
+        self._seq = count()
+        self._send: Callable[[dict[str, Any]], Awaitable[asyncio.Future]] | None = None
+        self._task: asyncio.Task | None = None
+        self._next_send = 0.0
+        self.sent = 0
+        self.collapsed = 0
+        self.expired = 0
+        self.dropped = 0
+        self.failed = 0
+
+    @callback
+    def async_set_sender(
+        self, send: Callable[[dict[str, Any]], Awaitable[asyncio.Future]] | None
+    ) -> None:
+        """Set the coroutine sending a notification, None when offline.
+
+        The coroutine returns the future of the command acknowledgement.
+        """
+        self._send = send
+        self._async_start()
+
+    @callback
+    def async_enqueue(
+        self,
+        payload: dict[str, Any],
+        priority: str,
+        collapse_key: str | None,
+        ttl: float,
+    ) -> asyncio.Future:
+        """Queue a notification.
+
+        Args:
+            payload: The notification to send.
+            priority: One of PRIORITIES.
+            collapse_key: Key of the queued notification to replace, if any.
+            ttl: Seconds after which the notification is dropped if it was
+                not sent.
+
+        Returns:
+            A future resolving with the acknowledgement of the agent.
+
+        """
+        future = self.hass.loop.create_future()
+        future.add_done_callback(_retrieve_exception)
+        entry = _QueuedNotification(
+            payload, PRIORITIES[priority], next(self._seq), collapse_key, future
+        )
+        if collapse_key is not None:
+            for index, queued in enumerate(self._queue):
+                if queued.collapse_key == collapse_key:
+                    # Take the place of the replaced notification
+                    entry.seq = queued.seq
+                    self._queue[index] = entry
+                    self._async_discard(queued)
+                    self.collapsed += 1
+                    break
+            else:
+                self._queue.append(entry)
+        else:
+            self._queue.append(entry)
+        if len(self._queue) > self.size:
+            lowest = min(self._queue, key=_QueuedNotification.sort_key)
+            self._queue.remove(lowest)
+            self._async_discard(
+                lowest, HomeAssistantError("SteamVR notification queue is full")
+            )
+            self.dropped += 1
+        if not entry.future.done():
+            entry.timer = self.hass.loop.call_later(ttl, self._async_expire, entry)
+        self._async_start()
+        return future
+
+    @callback
+    def _async_discard(
+        self, entry: _QueuedNotification, err: HomeAssistantError | None = None
+    ) -> None:
+        """Resolve a notification removed without being sent."""
+        if entry.timer is not None:
+            entry.timer.cancel()
+        if not entry.future.done():
+            if err is None:
+                entry.future.set_result(None)
+            else:
+                entry.future.set_exception(err)
+
+    @callback
+    def _async_expire(self, entry: _QueuedNotification) -> None:
+        """Drop a notification that was not sent within its time to live."""
+        entry.timer = None
+        if entry in self._queue:
+            self._queue.remove(entry)
+            self.expired += 1
+            self._async_discard(
+                entry, HomeAssistantError("SteamVR notification expired")
+            )
+
+    @callback
+    def _async_start(self) -> None:
+        """Start sending when connected and notifications are queued."""
+        if (
+            self._send is not None
+            and self._queue
+            and (self._task is None or self._task.done())
+        ):
+            self._task = self.config_entry.async_create_background_task(
+                self.hass, self._async_drain(), "steamvr_notifications"
+            )
+
+    async def _async_drain(self) -> None:
+        """Send the queued notifications until offline or empty."""
+        loop = self.hass.loop
+        while self._send is not None and self._queue:
+            if (delay := self._next_send - loop.time()) > 0:
+                await asyncio.sleep(delay)
+                continue
+            entry = max(self._queue, key=_QueuedNotification.sort_key)
+            self._queue.remove(entry)
+            self._next_send = loop.time() + self.interval
+            try:
+                ack = await self._send(entry.payload)
+            except (HomeAssistantError, websockets.ConnectionClosed) as err:
+                if self._send is None or isinstance(err, websockets.ConnectionClosed):
+                    # Disconnected while sending, keep it for the next
+                    # connection unless it expired meanwhile
+                    if entry.timer is not None:
+                        self._queue.append(entry)
+                    else:
+                        self.expired += 1
+                        self._async_discard(
+                            entry, HomeAssistantError("SteamVR notification expired")
+                        )
+                    return
+                _LOGGER.warning("Could not send a SteamVR notification: %s", err)
+                self.failed += 1
+                self._async_discard(entry, err)
+                continue
+            self.sent += 1
+            if entry.timer is not None:
+                entry.timer.cancel()
+                entry.timer = None
+            ack.add_done_callback(partial(_chain_result, target=entry.future))
+
+    @callback
+    def async_cancel_all(self) -> None:
+        """Stop sending and cancel the queued notifications."""
+        self._send = None
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        for entry in self._queue:
+            if entry.timer is not None:
+                entry.timer.cancel()
+            entry.future.cancel()
+        self._queue.clear()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the queue state for diagnostics."""
+        return {
+            "depth": len(self._queue),
+            "sent": self.sent,
+            "collapsed": self.collapsed,
+            "expired": self.expired,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import json
 from typing import Any
 
 from homeassistant.components.notify import (
@@ -15,7 +14,8 @@ from homeassistant.core import HomeAssistant
 from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
 
-from .const import DOMAIN
+from .const import CONF_WAIT_FOR_ACK, DEFAULT_NOTIFICATION_TTL, DOMAIN
+from .notifications import PRIORITIES, PRIORITY_NORMAL
 
 
 def get_service(
@@ -40,25 +40,60 @@ class SteamVRNotificationService(BaseNotificationService):
         self.coordinator = coordinator
 
     async def async_send_message(self, message: str = "", **kwargs: Any) -> None:
-        """Send a notification to SteamVR."""
+        """Queue a notification for SteamVR.
+
+        The optional ``priority``, ``collapse_key`` and ``ttl`` data fields
+        set the order, replacement and expiry of the queued notification.
+        """
 
         payload = {
             "basicTitle": kwargs.get(ATTR_TITLE, ATTR_TITLE_DEFAULT),
             "basicMessage": message,
         }
 
+        priority = PRIORITY_NORMAL
+        collapse_key = None
+        ttl = DEFAULT_NOTIFICATION_TTL
         if data := kwargs.get(ATTR_DATA):
             # Pick out fields that should go into the notification directly vs
             # into the notification data dictionary.
 
             for key, val in data.items():
-                if key in ["imageData", "imagePath", "imageUrl", "customProperties"]:
+                if key in [
+                    "imageData",
+                    "imageFile",
+                    "imagePath",
+                    "imageUrl",
+                    "customProperties",
+                ]:
                     payload[key] = val
 
+            priority = data.get("priority", priority)
+            if priority not in PRIORITIES:
+                raise HomeAssistantError(
+                    f"Invalid priority {priority}, expected one of {list(PRIORITIES)}"
+                )
+            if (collapse_key := data.get("collapse_key")) is not None:
+                collapse_key = str(collapse_key)
+            try:
+                ttl = float(data.get("ttl", ttl))
+            except (TypeError, ValueError) as err:
+                raise HomeAssistantError(f"Invalid ttl {data['ttl']}") from err
+
+        # Decode, resize and hash images in the executor, errors are raised
+        # here rather than when the queued notification is sent
+        payload = await self.coordinator.images.async_load(payload)
+
+        future = self.coordinator.notifications.async_enqueue(
+            payload, priority, collapse_key, ttl
+        )
+        if not self.coordinator.config_entry.options.get(CONF_WAIT_FOR_ACK, False):
+            return
+
         try:
-            await self.coordinator.websocket.send(json.dumps(payload))
-        except AttributeError as err:
-            raise HomeAssistantError("SteamVR is not connected.") from err
+            await future
+        except HomeAssistantError:
+            raise
         except ConnectionError as err:
             raise HomeAssistantError("SteamVR is not connected.") from err
         except Exception as err:
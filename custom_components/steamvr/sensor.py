@@ -2,13 +2,25 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import timedelta
+
 from homeassistant.components.sensor import (
     ENTITY_ID_FORMAT,
     SensorDeviceClass,
     SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import PERCENTAGE
+from homeassistant.const import (
+    PERCENTAGE,
+    EntityCategory,
+    UnitOfInformation,
+    UnitOfTime,
+)
 from homeassistant.core import HomeAssistant, callback
 
 from . import SteamVRCoordinator
@@ -20,10 +32,202 @@ except ImportError:
 
 from homeassistant.helpers.entity import async_generate_entity_id
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.typing import StateType
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import DOMAIN
-from .device import VRDeviceActivityLevel
+from .const import (
+    CONF_BATTERY_DEADBAND,
+    CONF_BATTERY_MIN_INTERVAL,
+    DEFAULT_BATTERY_DEADBAND,
+    DEFAULT_BATTERY_MIN_INTERVAL,
+    DOMAIN,
+)
+from .device import VRController, VRDeviceActivityLevel
+
+# Polling interval of the metric sensors, the other sensors are pushed
+SCAN_INTERVAL = timedelta(seconds=60)
+
+
+@dataclass(frozen=True, kw_only=True)
+class VRMetricSensorDescription(SensorEntityDescription):
+    """Describes a SteamVR coordinator metric sensor."""
+
+    value_fn: Callable[[SteamVRCoordinator], StateType]
+
+
+def _mean_ms(value: float | None) -> float | None:
+    """Convert a mean duration in seconds to milliseconds."""
+    return None if value is None else value * 1000
+
+
+METRIC_SENSORS = (
+    VRMetricSensorDescription(
+        key="messages_received",
+        name="Messages received",
+        icon="mdi:message-arrow-left",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: coordinator.metrics.messages_received.total(),
+    ),
+    VRMetricSensorDescription(
+        key="events_fired",
+        name="Events fired",
+        icon="mdi:lightning-bolt",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: coordinator.metrics.events_fired.total(),
+    ),
+    VRMetricSensorDescription(
+        key="commands_sent",
+        name="Commands sent",
+        icon="mdi:message-arrow-right",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: coordinator.metrics.commands_sent,
+    ),
+    VRMetricSensorDescription(
+        key="reconnects",
+        name="Reconnects",
+        icon="mdi:connection",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: coordinator.metrics.reconnects,
+    ),
+    VRMetricSensorDescription(
+        key="message_handling_time",
+        name="Message handling time",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        suggested_display_precision=3,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: _mean_ms(coordinator.metrics.handling_time.mean),
+    ),
+    VRMetricSensorDescription(
+        key="suppressed_updates",
+        name="Suppressed entity updates",
+        icon="mdi:filter-remove",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: coordinator.suppressed_updates,
+    ),
+    VRMetricSensorDescription(
+        key="battery_updates_suppressed",
+        name="Suppressed battery updates",
+        icon="mdi:battery-sync",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: coordinator.metrics.battery_updates_suppressed,
+    ),
+    VRMetricSensorDescription(
+        key="bytes_received",
+        name="Bytes received",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: coordinator.bytes_received,
+    ),
+    VRMetricSensorDescription(
+        key="bytes_sent",
+        name="Bytes sent",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: coordinator.bytes_sent,
+    ),
+)
+
+
+@dataclass(frozen=True, kw_only=True)
+class VRHistorySensorDescription(SensorEntityDescription):
+    """Describes a sensor derived from the SteamVR state history."""
+
+    # Device of the sensor, as in the identifiers of the other entities
+    device: str
+    value_fn: Callable[[SteamVRCoordinator], StateType]
+
+
+# Names of the devices, formatted with the config entry title
+HISTORY_DEVICE_NAMES = {
+    "vr_status": "VR Status ({})",
+    "vr_headset": "VR Headset ({})",
+    "right_controller": "Right Controller ({})",
+    "left_controller": "Left Controller ({})",
+}
+
+
+def _minutes(value: float | None) -> float | None:
+    """Convert seconds to minutes."""
+    return None if value is None else value / 60
+
+
+def _percent(value: float | None) -> float | None:
+    """Convert a ratio to percent."""
+    return None if value is None else value * 100
+
+
+def _controller_history(
+    method: str, side: str
+) -> Callable[[SteamVRCoordinator], StateType]:
+    """Return a value function reading a controller value of the history."""
+    return lambda coordinator: getattr(coordinator.history, method)(side)
+
+
+HISTORY_SENSORS = (
+    VRHistorySensorDescription(
+        key="on_head_ratio",
+        name="Headset on-head ratio",
+        icon="mdi:head-check",
+        native_unit_of_measurement=PERCENTAGE,
+        suggested_display_precision=0,
+        state_class=SensorStateClass.MEASUREMENT,
+        device="vr_headset",
+        value_fn=lambda coordinator: _percent(
+            coordinator.history.on_head_ratio(coordinator.hass.loop.time())
+        ),
+    ),
+    VRHistorySensorDescription(
+        key="play_time_today",
+        name="Play time today",
+        icon="mdi:timer-play",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        suggested_display_precision=0,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        device="vr_status",
+        value_fn=lambda coordinator: _minutes(coordinator.sessions.today_play_time()),
+    ),
+    VRHistorySensorDescription(
+        key="current_session",
+        name="Current session",
+        icon="mdi:timer-outline",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MINUTES,
+        suggested_display_precision=0,
+        device="vr_status",
+        value_fn=lambda coordinator: _minutes(
+            coordinator.sessions.current_session_length()
+        ),
+    ),
+    *(
+        description
+        for side in ("right", "left")
+        for description in (
+            VRHistorySensorDescription(
+                key=f"{side}_controller_drain_rate",
+                name=f"{side.capitalize()} Controller Battery drain",
+                icon="mdi:battery-arrow-down",
+                native_unit_of_measurement=f"{PERCENTAGE}/h",
+                suggested_display_precision=1,
+                state_class=SensorStateClass.MEASUREMENT,
+                device=f"{side}_controller",
+                value_fn=_controller_history("drain_rate", side),
+            ),
+            VRHistorySensorDescription(
+                key=f"{side}_controller_time_to_empty",
+                name=f"{side.capitalize()} Controller Battery time to empty",
+                device_class=SensorDeviceClass.DURATION,
+                native_unit_of_measurement=UnitOfTime.HOURS,
+                suggested_display_precision=1,
+                device=f"{side}_controller",
+                value_fn=_controller_history("time_to_empty", side),
+            ),
+        )
+    ),
+)
 
 
 async def async_setup_entry(
@@ -71,6 +275,41 @@ async def async_setup_entry(
                     hass=hass,
                 ),
             ),
+            VRLatencySensor(
+                config_entry,
+                coordinator,
+                async_generate_entity_id(
+                    ENTITY_ID_FORMAT,
+                    f"{config_entry.title}_agent_latency",
+                    hass=hass,
+                ),
+            ),
+            *(
+                VRMetricSensor(
+                    config_entry,
+                    coordinator,
+                    description,
+                    async_generate_entity_id(
+                        ENTITY_ID_FORMAT,
+                        f"{config_entry.title}_{description.key}",
+                        hass=hass,
+                    ),
+                )
+                for description in METRIC_SENSORS
+            ),
+            *(
+                VRHistorySensor(
+                    config_entry,
+                    coordinator,
+                    description,
+                    async_generate_entity_id(
+                        ENTITY_ID_FORMAT,
+                        f"{config_entry.title}_{description.key}",
+                        hass=hass,
+                    ),
+                )
+                for description in HISTORY_SENSORS
+            ),
         ]
     )
 
@@ -91,7 +330,7 @@ class HMDSensor(CoordinatorEntity, SensorEntity):
         self.config_entry_id = config_entry.entry_id
         self._attr_translation_key = "vr_status"
 
-        super().__init__(coordinator)
+        super().__init__(coordinator, context=frozenset({"hmd_activity_level"}))
 
     @property
     def device_info(self) -> DeviceInfo:
@@ -104,15 +343,23 @@ class HMDSensor(CoordinatorEntity, SensorEntity):
             name=self.device_name,
         )
 
+    async def async_added_to_hass(self) -> None:
+        """Fill the state from the data restored or received before adding."""
+        await super().async_added_to_hass()
+        if self.coordinator.data is not None:
+            self._async_update_attrs()
+
+    @callback
+    def _async_update_attrs(self) -> None:
+        """Set the state from the coordinator data."""
+        activity_level = VRDeviceActivityLevel(self.coordinator.data.hmd_activity_level)
+        self._attr_native_value = activity_level.name
+        self._attr_extra_state_attributes = {"hmd_activity_level": activity_level.value}
+
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        self._attr_native_value = VRDeviceActivityLevel(
-            self.coordinator.data.hmd_activity_level
-        ).name
-        self._attr_extra_state_attributes = {
-            "hmd_activity_level": self.coordinator.data.hmd_activity_level
-        }
+        self._async_update_attrs()
         super()._handle_coordinator_update()
 
 
@@ -140,8 +387,21 @@ class VRControllerBatterySensor(CoordinatorEntity, SensorEntity):
             f"{controller_side.capitalize()} Controller ({config_entry.title})"
         )
         self.config_entry_id = config_entry.entry_id
+        # Loop time and (is_connected, is_charging) of the last written level
+        self._published_at = 0.0
+        self._published_flags: tuple[bool, bool | None] | None = None
+        self._publish_timer: asyncio.TimerHandle | None = None
 
-        super().__init__(coordinator)
+        super().__init__(
+            coordinator,
+            context=frozenset(
+                {
+                    f"{controller_side}_controller.battery_percentage",
+                    f"{controller_side}_controller.is_charging",
+                    f"{controller_side}_controller.is_connected",
+                }
+            ),
+        )
 
     @property
     def device_info(self) -> DeviceInfo:
@@ -156,17 +416,94 @@ class VRControllerBatterySensor(CoordinatorEntity, SensorEntity):
             name=self.device_name,
         )
 
-    @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        controller_data = (
+    async def async_added_to_hass(self) -> None:
+        """Fill the state from the data restored or received before adding."""
+        await super().async_added_to_hass()
+        if self.coordinator.data is not None:
+            self._async_update_attrs()
+
+    @property
+    def _controller_data(self) -> VRController:
+        """Return the state of the controller."""
+        return (
             self.coordinator.data.right_controller
             if self.controller_side == "right"
             else self.coordinator.data.left_controller
         )
+
+    @callback
+    def _async_update_attrs(self) -> None:
+        """Set the battery level from the coordinator data."""
+        controller_data = self._controller_data
+        self._published_at = self.hass.loop.time()
+        self._published_flags = (
+            controller_data.is_connected,
+            controller_data.is_charging,
+        )
         self._attr_native_value = controller_data.battery_percentage
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        self._async_publish_level(new_update=True)
+
+    @callback
+    def _async_publish_deferred(self) -> None:
+        """Publish the level held back until the interval passed."""
+        self._publish_timer = None
+        self._async_publish_level(new_update=False)
+
+    @callback
+    def _async_publish_level(self, new_update: bool) -> None:
+        """Write the battery level, unless it is suppressed or deferred.
+
+        Args:
+            new_update: Whether a new coordinator update is checked, only those
+                are counted as suppressed, not the re-checks of the timer.
+
+        """
+        controller_data = self._controller_data
+        value = controller_data.battery_percentage
+        flags = (controller_data.is_connected, controller_data.is_charging)
+        if self._publish_timer is not None:
+            self._publish_timer.cancel()
+            self._publish_timer = None
+        # Charging and connection changes are always written immediately
+        if (
+            flags == self._published_flags
+            and value is not None
+            and self._attr_native_value is not None
+        ):
+            options = self.coordinator.config_entry.options
+            if abs(value - self._attr_native_value) < options.get(
+                CONF_BATTERY_DEADBAND, DEFAULT_BATTERY_DEADBAND
+            ):
+                if new_update:
+                    self.coordinator.metrics.battery_updates_suppressed += 1
+                return
+            wait = (
+                self._published_at
+                + options.get(CONF_BATTERY_MIN_INTERVAL, DEFAULT_BATTERY_MIN_INTERVAL)
+                - self.hass.loop.time()
+            )
+            if wait > 0:
+                if new_update:
+                    self.coordinator.metrics.battery_updates_suppressed += 1
+                # Write the latest level once the interval has passed
+                self._publish_timer = self.hass.loop.call_later(
+                    wait, self._async_publish_deferred
+                )
+                return
+        self._async_update_attrs()
         super()._handle_coordinator_update()
 
+    async def async_will_remove_from_hass(self) -> None:
+        """Cancel the pending write of a battery level."""
+        if self._publish_timer is not None:
+            self._publish_timer.cancel()
+            self._publish_timer = None
+        await super().async_will_remove_from_hass()
+
 
 class VRGameSensor(CoordinatorEntity, SensorEntity):
     """Representation of a VR Game Sensor."""
@@ -183,7 +520,10 @@ class VRGameSensor(CoordinatorEntity, SensorEntity):
         self.device_name = f"VR Status ({config_entry.title})"
         self.config_entry_id = config_entry.entry_id
 
-        super().__init__(coordinator)
+        super().__init__(
+            coordinator,
+            context=frozenset({"current_application_name", "current_application_key"}),
+        )
 
     @property
     def device_info(self) -> DeviceInfo:
@@ -193,12 +533,143 @@ class VRGameSensor(CoordinatorEntity, SensorEntity):
             name=self.device_name,
         )
 
+    async def async_added_to_hass(self) -> None:
+        """Fill the state from the data restored or received before adding."""
+        await super().async_added_to_hass()
+        if self.coordinator.data is not None:
+            self._async_update_attrs()
+
     @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
+    def _async_update_attrs(self) -> None:
+        """Set the state from the coordinator data."""
         state_data = self.coordinator.data
         self._attr_native_value = state_data.current_application_name
         self._attr_extra_state_attributes = {
             "current_application_key": state_data.current_application_key,
         }
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        self._async_update_attrs()
         super()._handle_coordinator_update()
+
+
+class VRLatencySensor(CoordinatorEntity, SensorEntity):
+    """Representation of the heartbeat round-trip time to the agent."""
+
+    def __init__(
+        self, config_entry: ConfigEntry, coordinator: SteamVRCoordinator, entity_id: str
+    ) -> None:
+        """Initialize the VR Latency Sensor."""
+        self.coordinator = coordinator
+        self._attr_name = "Agent latency"
+        self.entity_id = entity_id
+        self._attr_icon = "mdi:timer-sand"
+        self._attr_unique_id = f"{config_entry.entry_id}_VRLatencySensor"
+        self._attr_device_class = SensorDeviceClass.DURATION
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+        self._attr_suggested_display_precision = 0
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        # A heartbeat every few seconds would record thousands of states a
+        # day, the sensor is opt-in and only changes by whole milliseconds
+        self._attr_entity_registry_enabled_default = False
+        self.device_name = f"VR Status ({config_entry.title})"
+        self.config_entry_id = config_entry.entry_id
+
+        super().__init__(coordinator, context=frozenset({"latency"}))
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return the device info."""
+        return DeviceInfo(
+            identifiers={(DOMAIN, f"{self.config_entry_id}_vr_status")},
+            name=self.device_name,
+        )
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        latency = self.coordinator.latency
+        value = None if latency is None else round(latency * 1000)
+        if value == self._attr_native_value:
+            return
+        self._attr_native_value = value
+        super()._handle_coordinator_update()
+
+
+class VRMetricSensor(SensorEntity):
+    """Representation of a coordinator metric, polled to keep writes rare."""
+
+    entity_description: VRMetricSensorDescription
+
+    def __init__(
+        self,
+        config_entry: ConfigEntry,
+        coordinator: SteamVRCoordinator,
+        description: VRMetricSensorDescription,
+        entity_id: str,
+    ) -> None:
+        """Initialize the VR Metric Sensor."""
+        self.coordinator = coordinator
+        self.entity_description = description
+        self._attr_name = description.name
+        self.entity_id = entity_id
+        self._attr_unique_id = f"{config_entry.entry_id}_{description.key}"
+        self._attr_entity_category = EntityCategory.DIAGNOSTIC
+        self._attr_entity_registry_enabled_default = False
+        self.device_name = f"VR Status ({config_entry.title})"
+        self.config_entry_id = config_entry.entry_id
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return the device info."""
+        return DeviceInfo(
+            identifiers={(DOMAIN, f"{self.config_entry_id}_vr_status")},
+            name=self.device_name,
+        )
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the value of the metric."""
+        return self.entity_description.value_fn(self.coordinator)
+
+
+class VRHistorySensor(SensorEntity):
+    """Representation of a value derived from the state history, polled."""
+
+    entity_description: VRHistorySensorDescription
+
+    def __init__(
+        self,
+        config_entry: ConfigEntry,
+        coordinator: SteamVRCoordinator,
+        description: VRHistorySensorDescription,
+        entity_id: str,
+    ) -> None:
+        """Initialize the VR History Sensor."""
+        self.coordinator = coordinator
+        self.entity_description = description
+        self._attr_name = description.name
+        self.entity_id = entity_id
+        self._attr_unique_id = f"{config_entry.entry_id}_{description.key}"
+        self.device_name = HISTORY_DEVICE_NAMES[description.device].format(
+            config_entry.title
+        )
+        self.config_entry_id = config_entry.entry_id
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return the device info."""
+        return DeviceInfo(
+            identifiers={
+                (DOMAIN, f"{self.config_entry_id}_{self.entity_description.device}")
+            },
+            name=self.device_name,
+        )
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the derived value."""
+        return self.entity_description.value_fn(self.coordinator)
@@ -0,0 +1,231 @@
+"""Play session tracking for SteamVR."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from pathlib import Path
+from typing import Any
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .codec import json_dumps, json_loads
+from .device import VRDeviceActivityLevel, VRState
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds between writes of the closed sessions
+FLUSH_INTERVAL = 60
+# Bytes read at a time from the end of the sessions file
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def _append_sessions(path: Path, lines: list[bytes]) -> None:
+    """Append encoded sessions to the sessions file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "ab") as file:
+        file.writelines(lines)
+
+
+def _read_sessions_since(path: Path, since: float) -> list[list]:
+    """Read the sessions ending after a timestamp, newest first.
+
+    Sessions are appended when they close, so the file is ordered by end
+    time. It is read backwards in chunks until a session ending before
+    ``since``, the cost does not grow with the length of the history.
+    """
+    sessions = []
+    try:
+        with open(path, "rb") as file:
+            position = file.seek(0, os.SEEK_END)
+            rest = b""
+            while position:
+                size = min(READ_CHUNK_SIZE, position)
+                position -= size
+                file.seek(position)
+                lines = (file.read(size) + rest).split(b"\n")
+                # The first line may start in the previous chunk
+                rest = lines.pop(0) if position else b""
+                for line in reversed(lines):
+                    if not line.strip():
+                        continue
+                    session = json_loads(line)
+                    if session[1] <= since:
+                        return sessions
+                    sessions.append(session)
+    except FileNotFoundError:
+        pass
+    return sessions
+
+
+class _Session:
+    """An open play session."""
+
+    __slots__ = ("app_key", "idle", "idle_since", "start")
+
+    def __init__(self, app_key: str, start: float, active: bool) -> None:
+        self.app_key = app_key
+        self.start = start
+        # Seconds without user interaction, and the start of the current idle
+        # period if the headset is not in use
+        self.idle = 0.0
+        self.idle_since = None if active else start
+
+
+class SessionTracker:
+    """Derive play sessions from the state and append them to a file.
+
+    A session lasts while the same application runs, the time without user
+    interaction is counted as idle. Closed sessions are appended to a
+    JSON-lines file as ``[start, end, application key, idle seconds]``,
+    in batches written in the executor. Today's totals are updated when a
+    session closes, so reading them does not depend on the file size. At
+    startup they are rebuilt from the sessions of the end of the file.
+    """
+
+    def __init__(self, hass: HomeAssistant, path: Path) -> None:
+        """Initialize the tracker."""
+        self.hass = hass
+        self.path = path
+        self.session: _Session | None = None
+        self._pending: list[bytes] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._midnight = 0.0
+        self._today_total = 0.0
+        self.today_by_app: dict[str, float] = {}
+        self._unsub_stop: CALLBACK_TYPE | None = None
+
+    async def async_load(self) -> None:
+        """Load today's totals from the sessions file."""
+        self._roll_day()
+        try:
+            sessions = await self.hass.async_add_executor_job(
+                _read_sessions_since, self.path, self._midnight
+            )
+        except (OSError, ValueError) as err:
+            _LOGGER.warning("Could not read the SteamVR sessions: %s", err)
+            sessions = []
+        for start, end, app_key, _idle in sessions:
+            self._add_to_today(start, end, app_key)
+        self._unsub_stop = self.hass.bus.async_listen_once(
+            EVENT_HOMEASSISTANT_STOP, self._async_on_stop
+        )
+
+    @callback
+    def async_update(self, state: VRState) -> None:
+        """Open, close or update the session after a state change."""
+        now = dt_util.utcnow().timestamp()
+        app_key = state.current_application_key if state.is_openvr_connected else None
+        active = state.hmd_activity_level is VRDeviceActivityLevel.user_interaction
+        if self.session is not None and self.session.app_key != app_key:
+            self._async_close_session(now)
+        if self.session is None:
+            if app_key:
+                self.session = _Session(app_key, now, active)
+            return
+        session = self.session
+        if active and session.idle_since is not None:
+            session.idle += now - session.idle_since
+            session.idle_since = None
+        elif not active and session.idle_since is None:
+            session.idle_since = now
+
+    @callback
+    def _async_close_session(self, now: float) -> None:
+        """Close the open session and queue it for writing."""
+        session = self.session
+        self.session = None
+        if session.idle_since is not None:
+            session.idle += now - session.idle_since
+        self._roll_day()
+        self._add_to_today(session.start, now, session.app_key)
+        self._pending.append(
+            json_dumps(
+                [
+                    round(session.start, 1),
+                    round(now, 1),
+                    session.app_key,
+                    round(session.idle),
+                ]
+            )
+            + b"\n"
+        )
+        if self._timer is None:
+            self._timer = self.hass.loop.call_later(FLUSH_INTERVAL, self.async_flush)
+
+    @callback
+    def async_flush(self) -> None:
+        """Write the closed sessions in the executor."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        lines, self._pending = self._pending, []
+        self.hass.async_add_executor_job(_append_sessions, self.path, lines)
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Close the open session and write the pending sessions."""
+        if self._unsub_stop is not None:
+            self._unsub_stop()
+            self._unsub_stop = None
+        if self.session is not None:
+            self._async_close_session(dt_util.utcnow().timestamp())
+        self.async_flush()
+
+    @callback
+    def _async_on_stop(self, event: Event) -> None:
+        """Write the sessions when Home Assistant stops."""
+        self._unsub_stop = None
+        self.async_shutdown()
+
+    def _roll_day(self) -> None:
+        """Reset today's totals after midnight."""
+        midnight = dt_util.start_of_local_day().timestamp()
+        if midnight != self._midnight:
+            self._midnight = midnight
+            self._today_total = 0.0
+            self.today_by_app = {}
+
+    def _add_to_today(self, start: float, end: float, app_key: str) -> None:
+        """Add the part of a session after midnight to today's totals."""
+        if end <= self._midnight:
+            return
+        duration = end - max(start, self._midnight)
+        self._today_total += duration
+        self.today_by_app[app_key] = self.today_by_app.get(app_key, 0.0) + duration
+
+    def today_play_time(self) -> float:
+        """Return the seconds played today, including the open session."""
+        self._roll_day()
+        total = self._today_total
+        if self.session is not None:
+            total += dt_util.utcnow().timestamp() - max(
+                self.session.start, self._midnight
+            )
+        return total
+
+    def current_session_length(self) -> float | None:
+        """Return the seconds since the open session started."""
+        if self.session is None:
+            return None
+        return dt_util.utcnow().timestamp() - self.session.start
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the sessions state for diagnostics."""
+        return {
+            "current_session": (
+                None
+                if self.session is None
+                else {
+                    "app_key": self.session.app_key,
+                    "length": self.current_session_length(),
+                }
+            ),
+            "today_play_time": self.today_play_time(),
+            "today_by_app": self.today_by_app,
+        }
@@ -0,0 +1,93 @@
+"""Reference-counted SteamVR event subscriptions."""
+
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Callable
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import DOMAIN
+
+
+@callback
+def async_get_subscription_manager(
+    hass: HomeAssistant, entry_id: str
+) -> EventSubscriptionManager:
+    """Return the subscription manager of a config entry.
+
+    The manager is kept in hass.data across reloads of the entry, so the
+    subscriptions of attached device triggers survive a new coordinator.
+    """
+    return hass.data.setdefault(DOMAIN, {}).setdefault(
+        f"{entry_id}_event_subscriptions", EventSubscriptionManager()
+    )
+
+
+@callback
+def async_remove_subscription_manager(hass: HomeAssistant, entry_id: str) -> None:
+    """Forget the subscription manager of a removed config entry."""
+    hass.data.get(DOMAIN, {}).pop(f"{entry_id}_event_subscriptions", None)
+
+
+class EventSubscriptionManager:
+    """Track which events have listeners and tell the agent about them.
+
+    The agent is asked to forward an event when its first listener is added
+    and to stop when the last one is removed. While there is no connection
+    nothing is sent, the coordinator re-sends the active set on connect.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the manager."""
+        self._counts: Counter[str] = Counter()
+        self._manual: dict[str, CALLBACK_TYPE] = {}
+        self._send: Callable[[str, str], None] | None = None
+
+    @property
+    def active_events(self) -> list[str]:
+        """Return the events with at least one listener."""
+        return list(self._counts)
+
+    @callback
+    def async_set_sender(self, send: Callable[[str, str], None] | None) -> None:
+        """Set the callback sending (message type, event), None when offline."""
+        self._send = send
+
+    @callback
+    def async_acquire(self, event: str) -> CALLBACK_TYPE:
+        """Add a listener for an event, return a callback removing it."""
+        self._counts[event] += 1
+        if self._counts[event] == 1 and self._send is not None:
+            self._send("register_event", event)
+
+        released = False
+
+        @callback
+        def async_release() -> None:
+            nonlocal released
+            if released:
+                return
+            released = True
+            self._counts[event] -= 1
+            if self._counts[event] > 0:
+                return
+            del self._counts[event]
+            if self._send is not None:
+                self._send("unregister_event", event)
+
+        return async_release
+
+    @callback
+    def async_register_manual(self, event: str) -> None:
+        """Hold a subscription registered through the register_event service."""
+        if event not in self._manual:
+            self._manual[event] = self.async_acquire(event)
+
+    @callback
+    def async_unregister_manual(self, event: str) -> bool:
+        """Release a manual subscription, return False if there was none."""
+        if (release := self._manual.pop(event, None)) is None:
+            return False
+        release()
+        return True
@@ -0,0 +1,134 @@
+"""Dispatch of SteamVR events to the attached device triggers."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.core import (
+    CALLBACK_TYPE,
+    Event,
+    HassJob,
+    HomeAssistant,
+    callback,
+)
+
+from .const import DOMAIN
+
+DEVICE_TRIGGER_DISPATCHER = "device_trigger_dispatcher"
+
+
+@callback
+def async_get_trigger_dispatcher(hass: HomeAssistant) -> DeviceTriggerDispatcher:
+    """Return the device trigger dispatcher."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if (dispatcher := domain_data.get(DEVICE_TRIGGER_DISPATCHER)) is None:
+        dispatcher = domain_data[DEVICE_TRIGGER_DISPATCHER] = DeviceTriggerDispatcher(
+            hass
+        )
+    return dispatcher
+
+
+def _payload_matches(expected: dict[str, Any], payload: Any) -> bool:
+    """Return True if every expected key is present in the payload."""
+    if not isinstance(payload, dict):
+        return False
+    for key, value in expected.items():
+        if key not in payload:
+            return False
+        if isinstance(value, dict):
+            if not _payload_matches(value, payload[key]):
+                return False
+        elif payload[key] != value:
+            return False
+    return True
+
+
+class _AttachedTrigger:
+    """A device trigger waiting for its event."""
+
+    __slots__ = ("job", "payload", "trigger_data")
+
+    def __init__(
+        self, job: HassJob, trigger_data: dict[str, Any], payload: dict | None
+    ) -> None:
+        self.job = job
+        self.trigger_data = trigger_data
+        self.payload = payload
+
+
+class DeviceTriggerDispatcher:
+    """Route steamvr_event events to the triggers attached for them.
+
+    A single bus listener serves all device triggers. Triggers are indexed
+    by (device id, event type), so an event only reaches the triggers of its
+    device and type, which then check their optional payload filter.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the dispatcher."""
+        self.hass = hass
+        self._triggers: dict[tuple[str, str], list[_AttachedTrigger]] = {}
+        self._unsub_bus: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_attach(
+        self,
+        device_id: str,
+        event_type: str,
+        action: Callable,
+        trigger_info: dict[str, Any],
+        payload: dict | None = None,
+    ) -> CALLBACK_TYPE:
+        """Attach a trigger, return a callback detaching it."""
+        key = (device_id, event_type)
+        trigger = _AttachedTrigger(
+            HassJob(action, f"steamvr device trigger {trigger_info}"),
+            trigger_info["trigger_data"],
+            payload,
+        )
+        self._triggers.setdefault(key, []).append(trigger)
+        if self._unsub_bus is None:
+            self._unsub_bus = self.hass.bus.async_listen(
+                "steamvr_event", self._async_handle_event
+            )
+
+        @callback
+        def async_detach() -> None:
+            triggers = self._triggers.get(key)
+            if triggers is None or trigger not in triggers:
+                return
+            triggers.remove(trigger)
+            if not triggers:
+                del self._triggers[key]
+            if not self._triggers and self._unsub_bus is not None:
+                self._unsub_bus()
+                self._unsub_bus = None
+
+        return async_detach
+
+    @callback
+    def _async_handle_event(self, event: Event) -> None:
+        """Run the actions of the triggers matching an event."""
+        triggers = self._triggers.get(
+            (event.data.get("device_id"), event.data.get("type"))
+        )
+        if not triggers:
+            return
+        for trigger in list(triggers):
+            if trigger.payload and not _payload_matches(
+                trigger.payload, event.data.get("data")
+            ):
+                continue
+            self.hass.async_run_hass_job(
+                trigger.job,
+                {
+                    "trigger": {
+                        **trigger.trigger_data,
+                        "platform": "device",
+                        "event": event,
+                        "description": f"event '{event.event_type}'",
+                    }
+                },
+                event.context,
+            )
@@ -1,6 +1,22 @@
 """Utility functions for SteamVR Home Assistant integration."""
 
-VR_EVENT_MAPPING = {
+import sys
+from typing import NamedTuple
+
+
+class VREventType(NamedTuple):
+    """A SteamVR event type with its names in both formats."""
+
+    code: int
+    # WebSocket API format (VREvent_*)
+    name: str
+    # Home Assistant format (vr-event-*)
+    ha_name: str
+
+
+# The single source of the known events. The position of an event is its
+# integer code on the wire, so new events must only be appended.
+_VR_EVENT_NAMES = {
     "VREvent_None": "vr-event-none",
     "VREvent_TrackedDeviceActivated": "vr-event-tracked-device-activated",
     "VREvent_TrackedDeviceDeactivated": "vr-event-tracked-device-deactivated",
@@ -183,7 +199,16 @@ VR_EVENT_MAPPING = {
     "VREvent_VendorSpecific_Reserved_End": "vr-event-vendor-specific-reserved-end",
 }
 
-VR_EVENT_REVERSE_MAPPING = {v: k for k, v in VR_EVENT_MAPPING.items()}
+VR_EVENTS: tuple[VREventType, ...] = tuple(
+    VREventType(code, sys.intern(name), sys.intern(ha_name))
+    for code, (name, ha_name) in enumerate(_VR_EVENT_NAMES.items())
+)
+VR_EVENTS_BY_NAME = {event.name: event for event in VR_EVENTS}
+VR_EVENTS_BY_HA_NAME = {event.ha_name: event for event in VR_EVENTS}
+# Device trigger types, in Home Assistant format
+TRIGGER_TYPES = frozenset(VR_EVENTS_BY_HA_NAME)
+# Codes of the events in WebSocket API format, sent to agents using codes
+VR_EVENT_CODES = {event.name: event.code for event in VR_EVENTS}
 
 
 def normalize_vr_event_name(event_name: str) -> str:
@@ -199,8 +224,8 @@ def normalize_vr_event_name(event_name: str) -> str:
     if not event_name:
         return ""
 
-    if event_name in VR_EVENT_MAPPING:
-        return VR_EVENT_MAPPING[event_name]
+    if event_name in VR_EVENTS_BY_NAME:
+        return VR_EVENTS_BY_NAME[event_name].ha_name
 
     return event_name
 
@@ -218,7 +243,23 @@ def denormalize_vr_event_name(event_name: str) -> str:
     if not event_name:
         return ""
 
-    if event_name in VR_EVENT_REVERSE_MAPPING:
-        return VR_EVENT_REVERSE_MAPPING[event_name]
+    if event_name in VR_EVENTS_BY_HA_NAME:
+        return VR_EVENTS_BY_HA_NAME[event_name].name
 
     return event_name
+
+
+def vr_event_name_from_code(code: int) -> str | None:
+    """
+    Return the Home Assistant name of an event sent as an integer code.
+
+    Args:
+        code: The code of the event, see VR_EVENTS
+
+    Returns:
+        Event name in Home Assistant format (vr-event-*), None if unknown
+    """
+    if isinstance(code, int) and 0 <= code < len(VR_EVENTS):
+        return VR_EVENTS[code].ha_name
+
+    return None
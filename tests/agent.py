@@ -0,0 +1,306 @@
+"""A stand-in SteamVR agent speaking the websocket protocol."""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import json
+from collections.abc import Callable
+from typing import Any
+
+import websockets
+
+FULL_STATE = {
+    "type": "state",
+    "is_openvr_connected": True,
+    "hmd_activity_level": 1,
+    "current_application_key": "steam.app.620980",
+    "current_application_name": "Beat Saber",
+    "right_controller": {
+        "is_connected": True,
+        "battery_percentage": 80,
+        "is_charging": False,
+    },
+    "left_controller": {
+        "is_connected": True,
+        "battery_percentage": 75,
+        "is_charging": False,
+    },
+    "error": None,
+}
+
+
+def _merge(target: dict[str, Any], changes: dict[str, Any]) -> None:
+    """Apply changes to a state, merging the nested controller fields."""
+    for key, value in changes.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge(target[key], value)
+        else:
+            target[key] = value
+
+
+class FakeAgent:
+    """Websocket server behaving like the SteamVR agent.
+
+    The agent announces its capabilities when a client connects, unless it
+    is created without any, like the agents predating them. It answers
+    request_state with a full snapshot, keeps the registered events, caches
+    the images sent with an imageHash and acknowledges every message with an
+    id, failing the commands listed in ``reject``.
+
+    The ``*_frames`` methods build the frames of a load profile, which the
+    ``run_*`` methods send: a steady push rate, event storms, a headset
+    flapping between standby and idle, and reconnect cycles.
+    """
+
+    def __init__(self, capabilities: list[str] | None = None) -> None:
+        """Initialize the agent.
+
+        Args:
+            capabilities: Capabilities announced on connect, None to send no
+                capabilities message.
+
+        """
+        self.capabilities = capabilities
+        self.state = copy.deepcopy(FULL_STATE)
+        self.seq = 0
+        self.registered_events: set[str] = set()
+        self.images: set[str] = set()
+        # Error message of the commands to fail, by command name
+        self.reject: dict[str, str] = {}
+        self.received: list[dict[str, Any]] = []
+        # Event loop time at which the messages with an id arrived, by id
+        self.arrival_times: dict[int, float] = {}
+        self.connections = 0
+        self.port = 0
+        self._server: websockets.Server | None = None
+        self._websocket: websockets.ServerConnection | None = None
+        self._changed = asyncio.Condition()
+
+    async def start(self) -> None:
+        """Listen on a free local port."""
+        self._server = await websockets.serve(self._async_handle, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """Close the connection and stop listening."""
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def disconnect(self) -> None:
+        """Close the current connection, the client is expected to reconnect."""
+        if self._websocket is not None:
+            await self._websocket.close()
+
+    async def _async_handle(self, websocket: websockets.ServerConnection) -> None:
+        """Serve a client until it disconnects."""
+        self._websocket = websocket
+        async with self._changed:
+            self.connections += 1
+            self._changed.notify_all()
+        if self.capabilities is not None:
+            await self.send({"type": "capabilities", "capabilities": self.capabilities})
+        try:
+            async for frame in websocket:
+                message = json.loads(frame)
+                if "id" in message:
+                    self.arrival_times[message["id"]] = (
+                        asyncio.get_running_loop().time()
+                    )
+                error = self._handle_message(message)
+                if "id" in message:
+                    ack = {"type": "ack", "id": message["id"]}
+                    if error is not None:
+                        ack["error"] = error
+                    await websocket.send(json.dumps(ack))
+                if message.get("type") == "request_state":
+                    await self.send_state()
+                async with self._changed:
+                    self.received.append(message)
+                    self._changed.notify_all()
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            if self._websocket is websocket:
+                self._websocket = None
+
+    def _handle_message(self, message: dict[str, Any]) -> str | None:
+        """Apply a message of the client, return the error to reply with."""
+        message_type = message.get("type")
+        if message_type == "register_event":
+            self.registered_events.add(message["command"])
+        elif message_type == "register_events":
+            self.registered_events.update(message["commands"])
+        elif message_type == "unregister_event":
+            self.registered_events.discard(message["command"])
+        # Notifications are sent without a type
+        name = message.get("command", message_type or "notification")
+        if name in self.reject:
+            return self.reject[name]
+        if (image_ref := message.get("imageRef")) is not None:
+            if image_ref not in self.images:
+                return f"Unknown image {image_ref}"
+        elif (image_hash := message.get("imageHash")) is not None:
+            self.images.add(image_hash)
+        return None
+
+    async def send(self, *messages: dict[str, Any]) -> None:
+        """Send one message in its own frame, or several in an array frame."""
+        await self.send_raw(json.dumps(messages[0] if len(messages) == 1 else messages))
+
+    async def send_raw(self, frame: str | bytes) -> None:
+        """Send a frame as is."""
+        await self._websocket.send(frame)
+
+    def state_message(self, **changes: Any) -> dict[str, Any]:
+        """Apply changes to the state and return the full state message.
+
+        The message carries a sequence number when the agent announced
+        state_delta.
+        """
+        _merge(self.state, changes)
+        message = copy.deepcopy(self.state)
+        if "state_delta" in (self.capabilities or ()):
+            message["seq"] = self.seq
+        return message
+
+    async def send_state(self, **changes: Any) -> None:
+        """Apply changes to the state and send the full state."""
+        await self.send(self.state_message(**changes))
+
+    async def send_legacy_state(self, **changes: Any) -> None:
+        """Apply changes to the state and send it without a type."""
+        message = self.state_message(**changes)
+        del message["type"]
+        message.pop("seq", None)
+        await self.send(message)
+
+    async def send_delta(
+        self, changes: dict[str, Any], *, seq: int | None = None
+    ) -> None:
+        """Apply changes to the state and send them as a state_delta.
+
+        Args:
+            changes: The changed fields, controllers holding only the
+                changed controller fields.
+            seq: Sequence number to send instead of the next one, to
+                simulate a lost message.
+
+        """
+        _merge(self.state, changes)
+        self.seq = self.seq + 1 if seq is None else seq
+        await self.send({"type": "state_delta", "seq": self.seq, "state": changes})
+
+    async def send_event(self, event_type: str, event_data: Any = None) -> None:
+        """Send a SteamVR event."""
+        await self.send(
+            {"type": "event", "event_type": event_type, "event_data": event_data}
+        )
+
+    def steady_frames(self, count: int) -> list[str]:
+        """Return full state frames with a draining right controller battery."""
+        return [
+            json.dumps(
+                self.state_message(
+                    right_controller={"battery_percentage": 100 - index % 100}
+                )
+            )
+            for index in range(count)
+        ]
+
+    def event_storm_frames(
+        self, count: int, event_type: str = "VREvent_ButtonPress"
+    ) -> list[str]:
+        """Return event frames of one type for different devices."""
+        return [
+            json.dumps(
+                {
+                    "type": "event",
+                    "event_type": event_type,
+                    "event_data": {"trackedDeviceIndex": index % 16, "button": 33},
+                }
+            )
+            for index in range(count)
+        ]
+
+    def flapping_frames(self, count: int) -> list[str]:
+        """Return full state frames alternating the headset between standby and idle."""
+        return [
+            json.dumps(self.state_message(hmd_activity_level=3 if index % 2 else 0))
+            for index in range(count)
+        ]
+
+    async def run_steady(self, count: int, rate: float) -> None:
+        """Push states at a steady rate, in states per second."""
+        await self._async_push(self.steady_frames(count), rate)
+
+    async def run_event_storm(self, count: int, rate: float | None = None) -> None:
+        """Send a burst of events, back-to-back unless a rate is given."""
+        await self._async_push(self.event_storm_frames(count), rate)
+
+    async def run_flapping(self, count: int, rate: float | None = None) -> None:
+        """Flap the headset between standby and idle."""
+        await self._async_push(self.flapping_frames(count), rate)
+
+    async def run_reconnects(self, cycles: int, timeout: float = 10) -> None:
+        """Drop the connection and wait for the client to reconnect, repeatedly."""
+        for _ in range(cycles):
+            connections = self.connections
+            await self.disconnect()
+            await self.wait_connected(connections + 1, timeout)
+
+    async def _async_push(self, frames: list[str], rate: float | None) -> None:
+        """Send frames, waiting between them to keep a rate in frames per second."""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        for index, frame in enumerate(frames):
+            if rate:
+                await asyncio.sleep(max(0, start + index / rate - loop.time()))
+            await self.send_raw(frame)
+
+    async def wait_connected(self, connections: int = 1, timeout: float = 5) -> None:
+        """Wait until the client connected the given number of times."""
+        async with asyncio.timeout(timeout), self._changed:
+            await self._changed.wait_for(lambda: self.connections >= connections)
+
+    async def wait_for(
+        self, match: str | Callable[[dict[str, Any]], bool], timeout: float = 5
+    ) -> dict[str, Any]:
+        """Return the first received message of a type, or matching a predicate.
+
+        Messages already received count, call ``received.clear()`` to only
+        wait for new ones.
+        """
+        if isinstance(match, str):
+            message_type = match
+
+            def match(message: dict[str, Any]) -> bool:
+                return message.get("type") == message_type
+
+        def find() -> dict[str, Any] | None:
+            return next((message for message in self.received if match(message)), None)
+
+        async with asyncio.timeout(timeout), self._changed:
+            await self._changed.wait_for(lambda: find() is not None)
+        return find()
+
+
+async def async_start_agents(
+    count: int, capabilities: list[str] | None = None
+) -> list[FakeAgent]:
+    """Start many agents at once, each on its own local port."""
+    agents = [FakeAgent(capabilities) for _ in range(count)]
+    await asyncio.gather(*(agent.start() for agent in agents))
+    return agents
+
+
+async def async_stop_agents(agents: list[FakeAgent]) -> None:
+    """Stop the agents started by async_start_agents."""
+    await asyncio.gather(*(agent.stop() for agent in agents))
+
+
+async def async_wait_until(predicate: Callable[[], bool], timeout: float = 5) -> None:
+    """Wait until the client handled the frames sent to it, polling."""
+    async with asyncio.timeout(timeout):
+        while not predicate():
+            await asyncio.sleep(0.01)
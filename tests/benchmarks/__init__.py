@@ -0,0 +1 @@
+"""Benchmarks of the SteamVR integration hot paths."""
@@ -0,0 +1,56 @@
+"""Benchmarks of the JSON codec backends."""
+
+from __future__ import annotations
+
+import pytest
+
+from custom_components.steamvr.codec import BACKENDS
+
+from ..agent import FULL_STATE
+
+PAYLOADS = {
+    "state": FULL_STATE,
+    "event": {
+        "type": "event",
+        "event_type": "VREvent_ButtonPress",
+        "event_data": {"trackedDeviceIndex": 1, "button": 33},
+    },
+    "notification": {
+        "id": 1,
+        "basicTitle": "Home Assistant",
+        "basicMessage": "The front door was opened",
+        "imageRef": "9f86d081884c7d659a2feaa0c55ad015a3bf4f1b2b0b822cd15d6c15b0f00a08",
+    },
+}
+
+backends = pytest.mark.parametrize(
+    "backend",
+    [
+        pytest.param(
+            name,
+            marks=pytest.mark.skipif(
+                name not in BACKENDS, reason=f"{name} is not installed"
+            ),
+        )
+        for name in ("orjson", "msgspec", "json")
+    ],
+)
+payloads = pytest.mark.parametrize("payload", list(PAYLOADS))
+
+
+@backends
+@payloads
+def test_json_loads(benchmark, backend: str, payload: str) -> None:
+    """Benchmark decoding a message with each backend."""
+    json_loads, json_dumps = BACKENDS[backend]
+    data = json_dumps(PAYLOADS[payload])
+    assert benchmark(json_loads, data) == PAYLOADS[payload]
+
+
+@backends
+@payloads
+def test_json_dumps(benchmark, backend: str, payload: str) -> None:
+    """Benchmark encoding a message with each backend."""
+    json_loads, json_dumps = BACKENDS[backend]
+    data = benchmark(json_dumps, PAYLOADS[payload])
+    assert json_loads(data) == PAYLOADS[payload]
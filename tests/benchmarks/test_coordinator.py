@@ -0,0 +1,213 @@
+"""Benchmarks of the coordinator hot paths."""
+
+from __future__ import annotations
+
+import itertools
+import json
+import os
+from collections.abc import Coroutine
+from typing import Any
+
+import pytest
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers import entity_registry as er
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+from websockets.extensions.permessage_deflate import (
+    PerMessageDeflate,
+    ServerPerMessageDeflateFactory,
+)
+from websockets.frames import Frame, Opcode
+
+from custom_components.steamvr import SteamVRCoordinator
+from custom_components.steamvr.capture import _read_frames
+from custom_components.steamvr.const import DOMAIN
+from custom_components.steamvr.device import VRState, dataclass_from_dict
+from custom_components.steamvr.device_trigger import (
+    _async_get_triggers_cache,
+    async_get_triggers,
+)
+
+from ..agent import FakeAgent
+
+# Capture file recorded with the "Record the Agent traffic" option, whose
+# inbound frames are replayed by test_on_message_capture
+CAPTURE_ENV = "STEAMVR_BENCHMARK_CAPTURE"
+
+
+def run_sync(coro: Coroutine[Any, Any, Any]) -> Any:
+    """Run a coroutine that never suspends, inside a benchmarked function.
+
+    The benchmark fixture calls functions synchronously, on the event loop
+    running the test, so coroutines without an await point are stepped
+    directly instead of being scheduled.
+    """
+    try:
+        coro.send(None)
+    except StopIteration as err:
+        return err.value
+    coro.close()
+    raise RuntimeError(f"{coro!r} suspended")
+
+
+def _frames(agent: FakeAgent, kind: str) -> list[str]:
+    """Return two frames of a kind, alternated so every frame is a change."""
+    if kind == "event":
+        return [
+            json.dumps(
+                {
+                    "type": "event",
+                    "event_type": "VREvent_ButtonPress",
+                    "event_data": {"trackedDeviceIndex": index, "button": 33},
+                }
+            )
+            for index in (1, 2)
+        ]
+    frames = []
+    for level in (0, 1):
+        message = agent.state_message(hmd_activity_level=level)
+        if kind == "legacy":
+            del message["type"]
+        frames.append(json.dumps(message))
+    return frames
+
+
+@pytest.mark.parametrize("kind", ["state", "legacy", "event"])
+async def test_on_message(
+    benchmark, coordinator: SteamVRCoordinator, agent: FakeAgent, kind: str
+) -> None:
+    """Benchmark handling a frame of each kind, up to the entity writes."""
+    frames = itertools.cycle(_frames(agent, kind))
+    benchmark(lambda: run_sync(coordinator.on_message(next(frames))))
+    assert coordinator.metrics.messages_received[kind] > 0
+
+
+@pytest.mark.parametrize("profile", ["steady", "event_storm", "flapping"])
+async def test_on_message_profile(
+    benchmark, coordinator: SteamVRCoordinator, agent: FakeAgent, profile: str
+) -> None:
+    """Benchmark handling the 100 frames of a load profile of the agent."""
+    frames = getattr(agent, f"{profile}_frames")(100)
+
+    def handle_all() -> None:
+        for frame in frames:
+            run_sync(coordinator.on_message(frame))
+
+    benchmark(handle_all)
+    assert not coordinator.metrics.messages_invalid
+
+
+def _deflate_pair(
+    coordinator: SteamVRCoordinator,
+) -> tuple[PerMessageDeflate, PerMessageDeflate]:
+    """Negotiate permessage-deflate with the options of the coordinator.
+
+    Returns the extensions of the agent and of the coordinator.
+    """
+    (client_factory,) = coordinator._connect_options()["extensions"]
+    agent_factory = ServerPerMessageDeflateFactory()
+    response_params, agent_extension = agent_factory.process_request_params(
+        client_factory.get_request_params(), []
+    )
+    client_extension = client_factory.process_response_params(response_params, [])
+    return agent_extension, client_extension
+
+
+@pytest.mark.skipif(not os.environ.get(CAPTURE_ENV), reason=f"{CAPTURE_ENV} is not set")
+@pytest.mark.parametrize("compression", [False, True], ids=["plain", "deflate"])
+async def test_on_message_capture(
+    benchmark, coordinator: SteamVRCoordinator, compression: bool
+) -> None:
+    """Benchmark handling the inbound frames of a recorded capture.
+
+    With compression every frame is also deflated by the agent and inflated
+    by the coordinator, with the default compression options.
+    """
+    frames = [
+        frame["msg"]
+        for frame in _read_frames(os.environ[CAPTURE_ENV])
+        if frame["dir"] == "in"
+    ]
+
+    if compression:
+        agent_extension, client_extension = _deflate_pair(coordinator)
+        frames = [
+            Frame(Opcode.TEXT, frame.encode() if isinstance(frame, str) else frame)
+            for frame in frames
+        ]
+
+        def replay() -> None:
+            for frame in frames:
+                received = client_extension.decode(agent_extension.encode(frame))
+                run_sync(coordinator.on_message(received.data))
+
+    else:
+
+        def replay() -> None:
+            for frame in frames:
+                run_sync(coordinator.on_message(frame))
+
+    benchmark(replay)
+
+
+@pytest.mark.parametrize("agent_count", [1, 10, 100])
+async def test_entity_fan_out(
+    benchmark,
+    coordinators: list[SteamVRCoordinator],
+    agents: list[FakeAgent],
+) -> None:
+    """Benchmark publishing a state to the entities of many config entries."""
+    states = itertools.cycle(
+        [
+            dataclass_from_dict(
+                VRState,
+                agents[0].state_message(
+                    hmd_activity_level=level,
+                    right_controller={"battery_percentage": 80 - level},
+                ),
+            )
+            for level in (0, 1)
+        ]
+    )
+
+    def publish() -> None:
+        state = next(states)
+        for coordinator in coordinators:
+            coordinator.async_set_updated_data(state)
+
+    benchmark(publish)
+
+
+@pytest.mark.parametrize("cached", [True, False], ids=["cached", "cold"])
+async def test_async_get_triggers(benchmark, hass: HomeAssistant, cached: bool) -> None:
+    """Benchmark listing the triggers of 100 SteamVR devices."""
+    device_registry = dr.async_get(hass)
+    entity_registry = er.async_get(hass)
+    device_ids = []
+    for index in range(100):
+        entry = MockConfigEntry(domain=DOMAIN, title=f"Test {index}")
+        entry.add_to_hass(hass)
+        device = device_registry.async_get_or_create(
+            config_entry_id=entry.entry_id,
+            identifiers={(DOMAIN, f"{entry.entry_id}_vr_status")},
+        )
+        entity_registry.async_get_or_create(
+            "sensor",
+            DOMAIN,
+            f"{entry.entry_id}_HMDSensor",
+            config_entry=entry,
+            device_id=device.id,
+        )
+        device_ids.append(device.id)
+    await hass.async_block_till_done()
+    cache = _async_get_triggers_cache(hass)
+
+    def get_all_triggers() -> list[list[dict]]:
+        if not cached:
+            cache.clear()
+        return [
+            run_sync(async_get_triggers(hass, device_id)) for device_id in device_ids
+        ]
+
+    triggers = benchmark(get_all_triggers)
+    assert all(triggers)
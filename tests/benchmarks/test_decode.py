@@ -0,0 +1,79 @@
+"""Benchmarks of the message decoding helpers."""
+
+from dataclasses import fields
+
+import pytest
+
+from custom_components.steamvr.device import (
+    VRState,
+    dataclass_apply_patch,
+    dataclass_from_dict,
+)
+from custom_components.steamvr.utils import (
+    VR_EVENTS,
+    denormalize_vr_event_name,
+    normalize_vr_event_name,
+)
+
+from ..agent import FULL_STATE
+
+
+def recursive_dataclass_from_dict(_class, d):
+    """Convert a dictionary to a dataclass object, as before the compiled decoder.
+
+    The field types are looked up on every call and every value is recursed
+    into, non-dataclass values being returned by the failing fields() call.
+    """
+    try:
+        fieldtypes = {f.name: f.type for f in fields(_class)}
+        return _class(
+            **{f: recursive_dataclass_from_dict(fieldtypes[f], d[f]) for f in d}
+        )
+    except Exception:
+        return d  # Not a dataclass field
+
+
+@pytest.mark.parametrize(
+    "decode",
+    [dataclass_from_dict, recursive_dataclass_from_dict],
+    ids=["compiled", "recursive"],
+)
+def test_dataclass_from_dict(benchmark, decode) -> None:
+    """Benchmark decoding a full state, against the former recursive decoder."""
+    state = benchmark(decode, VRState, FULL_STATE)
+    assert state.right_controller.battery_percentage == 80
+
+
+def test_dataclass_apply_patch(benchmark) -> None:
+    """Benchmark applying a state_delta with a nested controller field."""
+    base = dataclass_from_dict(VRState, FULL_STATE)
+    state = benchmark(
+        dataclass_apply_patch, base, {"right_controller": {"battery_percentage": 50}}
+    )
+    assert state.right_controller.battery_percentage == 50
+
+
+@pytest.mark.parametrize("known", [True, False], ids=["known", "unknown"])
+def test_normalize_vr_event_name(benchmark, known: bool) -> None:
+    """Benchmark normalizing every event name sent by the agent."""
+    names = [event.name if known else f"Custom{event.name}" for event in VR_EVENTS]
+
+    def normalize_all() -> list[str]:
+        return [normalize_vr_event_name(name) for name in names]
+
+    normalized = benchmark(normalize_all)
+    assert (normalized[0] == VR_EVENTS[0].ha_name) is known
+
+
+@pytest.mark.parametrize("known", [True, False], ids=["known", "unknown"])
+def test_denormalize_vr_event_name(benchmark, known: bool) -> None:
+    """Benchmark denormalizing every trigger type sent to the agent."""
+    names = [
+        event.ha_name if known else f"custom-{event.ha_name}" for event in VR_EVENTS
+    ]
+
+    def denormalize_all() -> list[str]:
+        return [denormalize_vr_event_name(name) for name in names]
+
+    denormalized = benchmark(denormalize_all)
+    assert (denormalized[0] == VR_EVENTS[0].name) is known
@@ -0,0 +1,111 @@
+"""Fixtures for the SteamVR tests."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncGenerator
+
+import pytest
+from homeassistant.const import CONF_HOST, CONF_NAME, CONF_PORT
+from homeassistant.core import HomeAssistant
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from custom_components.steamvr import SteamVRCoordinator
+from custom_components.steamvr.connections import async_get_connection_manager
+from custom_components.steamvr.const import (
+    CONF_HEARTBEAT_INTERVAL,
+    CONF_NOTIFICATION_RATE,
+    DOMAIN,
+)
+
+from .agent import FakeAgent, async_start_agents, async_stop_agents
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Enable the custom integration in all tests."""
+    return
+
+
+@pytest.fixture
+def agent_capabilities() -> list[str] | None:
+    """Return the capabilities of the agent, parametrize to change them."""
+    return []
+
+
+def _mock_config_entry(agent: FakeAgent, name: str = "Test") -> MockConfigEntry:
+    """Return a config entry of a stand-in agent, without heartbeats or pacing."""
+    return MockConfigEntry(
+        domain=DOMAIN,
+        title=name,
+        data={CONF_HOST: "127.0.0.1", CONF_PORT: str(agent.port), CONF_NAME: name},
+        options={CONF_HEARTBEAT_INTERVAL: 0, CONF_NOTIFICATION_RATE: 0},
+    )
+
+
+@pytest.fixture
+async def agent(
+    socket_enabled: None, agent_capabilities: list[str] | None
+) -> AsyncGenerator[FakeAgent]:
+    """Start a stand-in agent on a local port."""
+    agent = FakeAgent(agent_capabilities)
+    await agent.start()
+    yield agent
+    await agent.stop()
+
+
+@pytest.fixture
+def config_entry(agent: FakeAgent) -> MockConfigEntry:
+    """Return a config entry of the stand-in agent."""
+    return _mock_config_entry(agent)
+
+
+@pytest.fixture
+async def coordinator(
+    hass: HomeAssistant, agent: FakeAgent, config_entry: MockConfigEntry
+) -> AsyncGenerator[SteamVRCoordinator]:
+    """Set up the config entry and wait until it connected to the agent."""
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    await agent.wait_connected()
+    yield hass.data[DOMAIN][f"{config_entry.entry_id}_coordinator"]
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+
+@pytest.fixture
+def agent_count() -> int:
+    """Return the number of agents of the agents fixture, parametrize to change it."""
+    return 10
+
+
+@pytest.fixture
+async def agents(
+    socket_enabled: None, agent_capabilities: list[str] | None, agent_count: int
+) -> AsyncGenerator[list[FakeAgent]]:
+    """Start many stand-in agents at once."""
+    agents = await async_start_agents(agent_count, agent_capabilities)
+    yield agents
+    await async_stop_agents(agents)
+
+
+@pytest.fixture
+async def coordinators(
+    hass: HomeAssistant, agents: list[FakeAgent]
+) -> AsyncGenerator[list[SteamVRCoordinator]]:
+    """Set up a config entry per agent and wait until all of them connected."""
+    # Connect without spacing the attempts, the handshakes are still limited
+    async_get_connection_manager(hass).stagger = 0
+    entries = [
+        _mock_config_entry(agent, f"Test {index}") for index, agent in enumerate(agents)
+    ]
+    for entry in entries:
+        entry.add_to_hass(hass)
+        assert await hass.config_entries.async_setup(entry.entry_id)
+    await hass.async_block_till_done()
+    await asyncio.gather(*(agent.wait_connected(timeout=10) for agent in agents))
+    yield [hass.data[DOMAIN][f"{entry.entry_id}_coordinator"] for entry in entries]
+    for entry in entries:
+        assert await hass.config_entries.async_unload(entry.entry_id)
+    await hass.async_block_till_done()
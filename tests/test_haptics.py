@@ -0,0 +1,87 @@
+"""Tests of the SteamVR haptic patterns."""
+
+import statistics
+from typing import Any
+
+import pytest
+
+from custom_components.steamvr import SteamVRCoordinator
+from custom_components.steamvr.haptics import (
+    async_play_haptic_pattern,
+    build_haptic_pattern,
+)
+
+from .agent import FakeAgent, async_wait_until
+
+# Largest accepted lateness of a pulse scheduled on the event loop, seconds
+MAX_JITTER = 0.005
+
+
+def _pulses(agent: FakeAgent) -> list[dict[str, Any]]:
+    """Return the vibration commands received by the agent, in order."""
+    return [
+        message
+        for message in agent.received
+        if message.get("command") == "vibrate_controller_right"
+    ]
+
+
+def test_build_haptic_pattern() -> None:
+    """Test the start offsets and defaults of a pattern."""
+    assert build_haptic_pattern(
+        [{"duration": 100, "pause": 50}, {"duration": 300, "amplitude": 0.5}],
+        1.0,
+        160,
+    ) == [
+        {"start": 0, "duration": 100, "amplitude": 1.0, "frequency": 160},
+        {"start": 150, "duration": 300, "amplitude": 0.5, "frequency": 160},
+    ]
+
+
+@pytest.mark.parametrize("agent_capabilities", [["haptic_patterns"]])
+async def test_pattern_command(
+    coordinator: SteamVRCoordinator, agent: FakeAgent
+) -> None:
+    """Test agents supporting patterns get the whole pattern at once."""
+    await async_wait_until(lambda: bool(coordinator.agent_capabilities))
+    pattern = build_haptic_pattern([{"duration": 20, "pause": 30}] * 3, 0.5, 160)
+    await async_play_haptic_pattern(coordinator, "left", pattern)
+    message = await agent.wait_for("command")
+    assert message["command"] == "haptic"
+    assert message["controller"] == "left"
+    assert message["pattern"] == pattern
+    assert not coordinator.haptic_timers
+
+
+async def test_scheduled_pulse_timing(
+    coordinator: SteamVRCoordinator, agent: FakeAgent
+) -> None:
+    """Test the pulses of older agents arrive at their start offsets."""
+    pattern = build_haptic_pattern([{"duration": 20, "pause": 30}] * 10, 0.5, 160)
+    await async_play_haptic_pattern(coordinator, "right", pattern)
+    await async_wait_until(lambda: len(_pulses(agent)) == len(pattern))
+
+    pulses = _pulses(agent)
+    first = agent.arrival_times[pulses[0]["id"]]
+    jitter = [
+        abs(agent.arrival_times[message["id"]] - first - pulse["start"] / 1000)
+        for message, pulse in zip(pulses, pattern)
+    ]
+    # The agent shares the event loop of the test, a stall of the loop delays
+    # single arrivals, so only most pulses are required to be on time
+    assert statistics.median(jitter) < MAX_JITTER
+    assert coordinator.metrics.haptic_jitter.count == len(pattern)
+    assert coordinator.metrics.haptic_jitter.mean < MAX_JITTER
+    assert not coordinator.haptic_timers
+
+
+async def test_scheduled_pulses_cancelled_on_disconnect(
+    coordinator: SteamVRCoordinator, agent: FakeAgent
+) -> None:
+    """Test the pulses not sent yet are dropped with the connection."""
+    pattern = build_haptic_pattern([{"duration": 20, "pause": 980}] * 5, 0.5, 160)
+    await async_play_haptic_pattern(coordinator, "right", pattern)
+    await async_wait_until(lambda: len(_pulses(agent)) == 1)
+    await agent.disconnect()
+    await async_wait_until(lambda: coordinator.websocket is None)
+    assert not coordinator.haptic_timers
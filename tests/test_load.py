@@ -0,0 +1,64 @@
+"""Tests of the coordinator under the load profiles of the stand-in agent."""
+
+import asyncio
+
+from custom_components.steamvr import SteamVRCoordinator
+from custom_components.steamvr.device import VRDeviceActivityLevel
+
+from .agent import FakeAgent, async_wait_until
+
+
+async def test_steady_rate(coordinator: SteamVRCoordinator, agent: FakeAgent) -> None:
+    """Test every state pushed at a steady rate is handled."""
+    await agent.run_steady(50, rate=200)
+    await async_wait_until(lambda: coordinator.metrics.messages_received["state"] == 50)
+    assert coordinator.data.right_controller.battery_percentage == 51
+
+
+async def test_event_storm(coordinator: SteamVRCoordinator, agent: FakeAgent) -> None:
+    """Test a burst of events is fired without losing any."""
+    await agent.run_event_storm(500)
+    await async_wait_until(
+        lambda: coordinator.metrics.messages_received["event"] == 500
+    )
+    assert sum(coordinator.metrics.events_fired.values()) == 500
+    assert coordinator.metrics.messages_invalid == 0
+
+
+async def test_flapping(coordinator: SteamVRCoordinator, agent: FakeAgent) -> None:
+    """Test a headset flapping between standby and idle ends in its last state."""
+    await agent.run_flapping(101)
+    await async_wait_until(
+        lambda: coordinator.metrics.messages_received["state"] == 101
+    )
+    assert coordinator.data.hmd_activity_level is VRDeviceActivityLevel.idle
+    # States arriving back-to-back are merged before reaching the entities
+    assert coordinator.metrics.states_merged > 0
+
+
+async def test_reconnect_cycles(
+    coordinator: SteamVRCoordinator, agent: FakeAgent
+) -> None:
+    """Test the coordinator follows repeated drops of the connection."""
+    await agent.run_reconnects(5)
+    await async_wait_until(lambda: coordinator.websocket is not None)
+    assert coordinator.metrics.connections == 6
+    await agent.run_steady(10, rate=200)
+    await async_wait_until(lambda: coordinator.metrics.messages_received["state"] == 10)
+
+
+async def test_many_agents(
+    coordinators: list[SteamVRCoordinator], agents: list[FakeAgent]
+) -> None:
+    """Test many config entries handle the states of their own agent at once."""
+    await asyncio.gather(*(agent.run_steady(20, rate=100) for agent in agents))
+    await async_wait_until(
+        lambda: all(
+            coordinator.metrics.messages_received["state"] == 20
+            for coordinator in coordinators
+        )
+    )
+    assert all(
+        coordinator.data.right_controller.battery_percentage == 81
+        for coordinator in coordinators
+    )
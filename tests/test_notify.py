@@ -0,0 +1,69 @@
+"""Tests of the SteamVR notifications."""
+
+import base64
+import hashlib
+from typing import Any
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.steamvr import SteamVRCoordinator
+
+from .agent import FakeAgent, async_wait_until
+
+# Not a decodable image, so it is sent as is whether Pillow is installed or not
+IMAGE = b"\x89PNG\r\n\x1a\n" + bytes(256)
+IMAGE_DATA = base64.b64encode(IMAGE).decode()
+IMAGE_HASH = hashlib.sha256(IMAGE).hexdigest()
+
+
+def _notifications(agent: FakeAgent) -> list[dict[str, Any]]:
+    """Return the notifications received by the agent."""
+    return [message for message in agent.received if "basicTitle" in message]
+
+
+async def _async_notify(hass: HomeAssistant) -> None:
+    """Send a notification with the image."""
+    await hass.services.async_call(
+        "notify",
+        "test",
+        {"message": "Someone is at the door", "data": {"imageData": IMAGE_DATA}},
+        blocking=True,
+    )
+
+
+@pytest.mark.parametrize("agent_capabilities", [["image_cache"]])
+async def test_image_reference(
+    hass: HomeAssistant, coordinator: SteamVRCoordinator, agent: FakeAgent
+) -> None:
+    """Test an image is sent once per connection, then referenced."""
+    await _async_notify(hass)
+    await _async_notify(hass)
+    await async_wait_until(lambda: len(_notifications(agent)) == 2)
+    first, second = _notifications(agent)
+    assert first["imageData"] == IMAGE_DATA
+    assert first["imageHash"] == IMAGE_HASH
+    assert second["imageRef"] == IMAGE_HASH
+    assert "imageData" not in second
+    assert coordinator.notifications.failed == 0
+
+    # A reconnected agent may have lost its cache
+    await agent.disconnect()
+    await agent.wait_connected(2)
+    await async_wait_until(lambda: coordinator.websocket is not None)
+    await _async_notify(hass)
+    await async_wait_until(lambda: len(_notifications(agent)) == 3)
+    assert _notifications(agent)[2]["imageData"] == IMAGE_DATA
+
+
+async def test_image_without_cache(
+    hass: HomeAssistant, coordinator: SteamVRCoordinator, agent: FakeAgent
+) -> None:
+    """Test agents without the image cache always get the image."""
+    await _async_notify(hass)
+    await _async_notify(hass)
+    await async_wait_until(lambda: len(_notifications(agent)) == 2)
+    for notification in _notifications(agent):
+        assert notification["imageData"] == IMAGE_DATA
+        assert "imageHash" not in notification
+        assert "imageRef" not in notification
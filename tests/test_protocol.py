@@ -0,0 +1,189 @@
+"""Tests of the protocol spoken with the SteamVR agent."""
+
+import pytest
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.steamvr import SteamVRCoordinator
+from custom_components.steamvr.device import VRDeviceActivityLevel
+
+from .agent import FakeAgent, async_wait_until
+
+
+async def test_legacy_state(coordinator: SteamVRCoordinator, agent: FakeAgent) -> None:
+    """Test a state sent without a type by older agents."""
+    await agent.send_legacy_state(current_application_name="Half-Life: Alyx")
+    await async_wait_until(
+        lambda: coordinator.data.current_application_name == "Half-Life: Alyx"
+    )
+    assert coordinator.data.right_controller.battery_percentage == 80
+    assert coordinator.metrics.messages_received["legacy"] == 1
+
+
+async def test_state(coordinator: SteamVRCoordinator, agent: FakeAgent) -> None:
+    """Test a full state message."""
+    await agent.send_state(hmd_activity_level=3)
+    await async_wait_until(
+        lambda: coordinator.data.hmd_activity_level is VRDeviceActivityLevel.standby
+    )
+    assert coordinator.data.is_openvr_connected
+    assert coordinator.data.left_controller.battery_percentage == 75
+    assert coordinator.metrics.messages_received["state"] == 1
+
+
+@pytest.mark.parametrize("agent_capabilities", [["state_delta", "haptic_patterns"]])
+async def test_capabilities(coordinator: SteamVRCoordinator, agent: FakeAgent) -> None:
+    """Test the capabilities announced by the agent."""
+    await async_wait_until(lambda: bool(coordinator.agent_capabilities))
+    assert coordinator.agent_capabilities == {"state_delta", "haptic_patterns"}
+    # Agents sending deltas are asked for the snapshot they apply to
+    await agent.wait_for("request_state")
+
+
+async def test_capabilities_reset_on_reconnect(
+    coordinator: SteamVRCoordinator, agent: FakeAgent
+) -> None:
+    """Test the capabilities are forgotten with the connection."""
+    agent.capabilities = ["state_delta"]
+    await agent.disconnect()
+    await agent.wait_connected(2)
+    await async_wait_until(lambda: bool(coordinator.agent_capabilities))
+    agent.capabilities = None
+    await agent.disconnect()
+    await agent.wait_connected(3)
+    await async_wait_until(lambda: coordinator.websocket is not None)
+    assert coordinator.agent_capabilities == frozenset()
+
+
+@pytest.mark.parametrize("agent_capabilities", [["state_delta"]])
+async def test_state_delta(coordinator: SteamVRCoordinator, agent: FakeAgent) -> None:
+    """Test partial states are applied to the last snapshot."""
+    await async_wait_until(lambda: coordinator.data.is_openvr_connected)
+    await agent.send_delta({"right_controller": {"battery_percentage": 50}})
+    await async_wait_until(
+        lambda: coordinator.data.right_controller.battery_percentage == 50
+    )
+    assert coordinator.data.right_controller.is_connected
+    assert coordinator.data.left_controller.battery_percentage == 75
+    assert coordinator.data.current_application_name == "Beat Saber"
+
+    await agent.send_delta({"current_application_name": None})
+    await async_wait_until(lambda: coordinator.data.current_application_name is None)
+    assert coordinator.data.right_controller.battery_percentage == 50
+
+
+@pytest.mark.parametrize("agent_capabilities", [["state_delta"]])
+async def test_state_delta_gap(
+    coordinator: SteamVRCoordinator, agent: FakeAgent
+) -> None:
+    """Test a lost state_delta makes the coordinator ask for a snapshot."""
+    await async_wait_until(lambda: coordinator.data.is_openvr_connected)
+    agent.received.clear()
+    await agent.send_delta(
+        {"right_controller": {"battery_percentage": 50}}, seq=agent.seq + 2
+    )
+    await agent.wait_for("request_state")
+    # The delta was not applied, the snapshot sent in reply carries it
+    await async_wait_until(
+        lambda: coordinator.data.right_controller.battery_percentage == 50
+    )
+    assert len([m for m in agent.received if m.get("type") == "request_state"]) == 1
+
+
+async def test_array_frame(coordinator: SteamVRCoordinator, agent: FakeAgent) -> None:
+    """Test the messages of an array frame are handled in order."""
+    await agent.send(
+        agent.state_message(hmd_activity_level=0),
+        {"type": "event", "event_type": "VREvent_ButtonPress", "event_data": "a"},
+        agent.state_message(hmd_activity_level=1),
+    )
+    await async_wait_until(lambda: coordinator.metrics.messages_received["state"] == 2)
+    assert coordinator.data.hmd_activity_level is VRDeviceActivityLevel.user_interaction
+    assert coordinator.metrics.messages_received["event"] == 1
+    # Only the last state of the frame is published
+    assert coordinator.metrics.states_merged == 1
+
+
+async def test_command_ack(coordinator: SteamVRCoordinator, agent: FakeAgent) -> None:
+    """Test a command is resolved by the acknowledgement of its id."""
+    future = await coordinator.async_send_command(
+        {"type": "command", "command": "vibrate_controller_right", "duration": 100}
+    )
+    ack = await future
+    message = await agent.wait_for(lambda message: message.get("id") == ack["id"])
+    assert message["command"] == "vibrate_controller_right"
+    assert "vibrate_controller_right" in coordinator.commands.round_trip_times
+
+
+async def test_command_error(coordinator: SteamVRCoordinator, agent: FakeAgent) -> None:
+    """Test the error of an acknowledgement fails the command."""
+    agent.reject["vibrate_controller_left"] = "Controller is off"
+    future = await coordinator.async_send_command(
+        {"type": "command", "command": "vibrate_controller_left", "duration": 100}
+    )
+    with pytest.raises(HomeAssistantError, match="Controller is off"):
+        await future
+
+
+async def test_commands_buffered_while_offline(
+    coordinator: SteamVRCoordinator, agent: FakeAgent
+) -> None:
+    """Test commands issued while disconnected are sent after reconnecting."""
+    await agent.stop()
+    await async_wait_until(lambda: coordinator.websocket is None)
+    future = await coordinator.async_send_command(
+        {"type": "command", "command": "vibrate_controller_right", "duration": 100}
+    )
+    await agent.start()
+    coordinator.url = f"ws://127.0.0.1:{agent.port}"
+    await agent.wait_connected(2, timeout=10)
+    ack = await future
+    assert ack["id"] == (await agent.wait_for("command"))["id"]
+
+
+@pytest.mark.parametrize("agent_capabilities", [["register_events"]])
+async def test_register_events(
+    coordinator: SteamVRCoordinator, agent: FakeAgent
+) -> None:
+    """Test the subscriptions are restored in one message after reconnecting."""
+    await coordinator.register_event("vr-event-button-press")
+    await coordinator.register_event("vr-event-quit")
+    await async_wait_until(lambda: len(agent.registered_events) == 2)
+
+    # A restarted agent forgets the registrations
+    agent.registered_events.clear()
+    agent.received.clear()
+    await agent.disconnect()
+    await agent.wait_connected(2)
+    message = await agent.wait_for("register_events")
+    assert set(message["commands"]) == {"VREvent_ButtonPress", "VREvent_Quit"}
+    assert agent.registered_events == {"VREvent_ButtonPress", "VREvent_Quit"}
+    assert not [m for m in agent.received if m.get("type") == "register_event"]
+
+
+@pytest.mark.parametrize("agent_capabilities", [None])
+async def test_register_event_without_capability(
+    coordinator: SteamVRCoordinator, agent: FakeAgent
+) -> None:
+    """Test agents without register_events get one message per event."""
+    await coordinator.register_event("vr-event-button-press")
+    await coordinator.register_event("vr-event-quit")
+    await async_wait_until(lambda: len(agent.registered_events) == 2)
+
+    agent.registered_events.clear()
+    agent.received.clear()
+    await agent.disconnect()
+    await agent.wait_connected(2)
+    # Without a capabilities message they are sent after a delay
+    await async_wait_until(lambda: len(agent.registered_events) == 2)
+    assert not [m for m in agent.received if m.get("type") == "register_events"]
+
+
+async def test_unregister_event(
+    coordinator: SteamVRCoordinator, agent: FakeAgent
+) -> None:
+    """Test unregistering an event registered from Home Assistant."""
+    await coordinator.register_event("vr-event-quit")
+    await async_wait_until(lambda: agent.registered_events == {"VREvent_Quit"})
+    await coordinator.unregister_event("vr-event-quit")
+    await async_wait_until(lambda: not agent.registered_events)
+    assert coordinator.event_subscriptions.active_events == []